@@ -4,37 +4,101 @@ Comprehensive UI/UX Component Testing Script
 Tests all components without mock data
 """
 
+import io
+import re
+import sys
+import functools
 import requests
+import websocket
 import json
 import time
 from typing import Dict, List, Any
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from colorama import init, Fore, Style
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 init(autoreset=True)
 
 BASE_URL = "http://localhost:8000"
 FRONTEND_URL = "http://localhost:3000"
 
+# (connect, read) timeouts - short so transient failures retry fast
+TIMEOUT = (2, 8)
+LLM_TIMEOUT = (2, 60)  # strategy generation calls the LLM
+
+# Tailwind markers looked for on the frontend page
+RESPONSIVE_CLASSES = [
+    'sm:', 'md:', 'lg:', 'xl:', '2xl:',  # Breakpoints
+    'flex', 'grid',  # Layout
+    'dark:',  # Dark mode
+    'hover:', 'focus:',  # Interactive states
+    'transition', 'animate'  # Animations
+]
+# Lookahead so overlapping hits count too ('xl:' inside '2xl:')
+RESPONSIVE_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(cls) for cls in RESPONSIVE_CLASSES) + "))"
+)
+
+# Shared session: keepalive + fast retries with backoff on transient errors
+SESSION = requests.Session()
+_retries = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=["GET", "POST"],
+    respect_retry_after_header=True
+)
+_adapter = HTTPAdapter(max_retries=_retries, pool_connections=32, pool_maxsize=64)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+def flushes_output(method):
+    """Run a test group: stamp its results once, flush output when it finishes"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Results within a group share one timestamp
+        self._batch_ts = datetime.now().isoformat()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.flush()
+    return wrapper
+
 class UIComponentTester:
     def __init__(self):
         self.results = []
         self.passed = 0
         self.failed = 0
+        self._frontend_response = None
+        self.ws = None
+        # Test lines are buffered and written once per test group
+        self._buf = io.StringIO()
+        self._batch_ts = datetime.now().isoformat()
+        
+    def flush(self):
+        """Write buffered test lines to stdout in one go"""
+        output = self._buf.getvalue()
+        if output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        self._buf.seek(0)
+        self._buf.truncate()
         
     def log_test(self, component: str, test: str, passed: bool, details: str = ""):
         """Log test result"""
         status = f"{Fore.GREEN}✓ PASS" if passed else f"{Fore.RED}✗ FAIL"
-        print(f"{status}{Style.RESET_ALL} {component}: {test}")
+        self._buf.write(f"{status}{Style.RESET_ALL} {component}: {test}\n")
         if details:
-            print(f"  {Fore.YELLOW}→{Style.RESET_ALL} {details}")
+            self._buf.write(f"  {Fore.YELLOW}→{Style.RESET_ALL} {details}\n")
         
         self.results.append({
             'component': component,
             'test': test,
             'passed': passed,
             'details': details,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._batch_ts
         })
         
         if passed:
@@ -42,16 +106,18 @@ class UIComponentTester:
         else:
             self.failed += 1
     
+    @flushes_output
     def test_backend_connectivity(self) -> bool:
         """Test if backend is accessible"""
         try:
-            response = requests.get(f"{BASE_URL}/health", timeout=5)
+            response = SESSION.get(f"{BASE_URL}/health", timeout=TIMEOUT)
             self.log_test("Backend", "Health check", response.status_code == 200)
             return response.status_code == 200
         except Exception as e:
             self.log_test("Backend", "Health check", False, str(e))
             return False
     
+    @flushes_output
     def test_api_endpoints(self):
         """Test all API endpoints"""
         endpoints = [
@@ -63,27 +129,43 @@ class UIComponentTester:
             ("POST", "/api/advanced-backtest", {"code": "test", "symbol": "AAPL"})
         ]
         
-        for method, endpoint, data in endpoints:
-            try:
-                if method == "GET":
-                    response = requests.get(f"{BASE_URL}{endpoint}", timeout=5)
-                else:
-                    response = requests.post(
-                        f"{BASE_URL}{endpoint}", 
-                        json=data,
-                        timeout=5
+        # Probe all endpoints concurrently; results are logged in list order
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            futures = [
+                executor.submit(self._call_endpoint, method, endpoint, data)
+                for method, endpoint, data in endpoints
+            ]
+            
+            for (method, endpoint, _), future in zip(endpoints, futures):
+                try:
+                    response = future.result()
+                    passed = response.status_code in [200, 201, 400, 422]  # Accept validation errors
+                    self.log_test(
+                        "API", 
+                        f"{method} {endpoint}", 
+                        passed,
+                        f"Status: {response.status_code}"
                     )
-                
-                passed = response.status_code in [200, 201, 400, 422]  # Accept validation errors
-                self.log_test(
-                    "API", 
-                    f"{method} {endpoint}", 
-                    passed,
-                    f"Status: {response.status_code}"
-                )
-            except Exception as e:
-                self.log_test("API", f"{method} {endpoint}", False, str(e))
+                except Exception as e:
+                    self.log_test("API", f"{method} {endpoint}", False, str(e))
     
+    def _call_endpoint(self, method: str, endpoint: str, data: Any):
+        """Issue a single API request on the shared session"""
+        if method == "GET":
+            return SESSION.get(f"{BASE_URL}{endpoint}", timeout=TIMEOUT)
+        return SESSION.post(
+            f"{BASE_URL}{endpoint}", 
+            json=data,
+            timeout=LLM_TIMEOUT if endpoint == "/api/generate-strategy" else TIMEOUT
+        )
+    
+    def _get_frontend(self):
+        """Fetch the frontend page once and reuse it across checks"""
+        if self._frontend_response is None:
+            self._frontend_response = SESSION.get(FRONTEND_URL, timeout=TIMEOUT)
+        return self._frontend_response
+    
+    @flushes_output
     def test_frontend_components(self):
         """Test frontend component accessibility"""
         components = [
@@ -103,7 +185,7 @@ class UIComponentTester:
             # Since we can't directly test React components from Python,
             # we'll test if the frontend is running
             try:
-                response = requests.get(FRONTEND_URL, timeout=5)
+                response = self._get_frontend()
                 passed = response.status_code == 200
                 self.log_test(
                     "Frontend Component",
@@ -115,16 +197,17 @@ class UIComponentTester:
                 self.log_test("Frontend Component", component, False, str(e))
                 break  # Stop testing if frontend is down
     
+    @flushes_output
     def test_data_flow(self):
         """Test data flow without mock data"""
         print(f"\n{Fore.CYAN}Testing Data Flow (No Mock Data):{Style.RESET_ALL}")
         
         # Test 1: Generate strategy without mock
         try:
-            response = requests.post(
+            response = SESSION.post(
                 f"{BASE_URL}/api/generate-strategy",
                 json={"prompt": "Create a momentum strategy"},
-                timeout=10
+                timeout=LLM_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -148,7 +231,7 @@ class UIComponentTester:
         
         # Test 2: Fetch usage stats without mock
         try:
-            response = requests.get(f"{BASE_URL}/api/user/ideas", timeout=5)
+            response = SESSION.get(f"{BASE_URL}/api/user/ideas", timeout=TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 # Check if data has real structure (not mock defaults)
@@ -166,7 +249,7 @@ class UIComponentTester:
         
         # Test 3: Indicators without mock
         try:
-            response = requests.get(f"{BASE_URL}/api/indicators", timeout=5)
+            response = SESSION.get(f"{BASE_URL}/api/indicators", timeout=TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 self.log_test(
@@ -180,17 +263,17 @@ class UIComponentTester:
         except Exception as e:
             self.log_test("Data Flow", "Technical Indicators List", False, str(e))
     
+    @flushes_output
     def test_websocket_connection(self):
         """Test WebSocket connectivity"""
         print(f"\n{Fore.CYAN}Testing WebSocket:{Style.RESET_ALL}")
         
-        import websocket
-        
         try:
-            ws = websocket.create_connection("ws://localhost:8000/ws")
-            ws.send(json.dumps({"type": "ping"}))
-            result = ws.recv()
-            ws.close()
+            # Connection is kept open for reuse and closed in teardown()
+            if self.ws is None:
+                self.ws = websocket.create_connection("ws://localhost:8000/ws", timeout=5)
+            self.ws.send(json.dumps({"type": "ping"}))
+            result = self.ws.recv()
             
             self.log_test(
                 "WebSocket",
@@ -200,28 +283,22 @@ class UIComponentTester:
             )
         except Exception as e:
             self.log_test("WebSocket", "Connection and messaging", False, str(e))
+            # Drop a broken connection so the next test reconnects
+            self.teardown()
     
+    @flushes_output
     def test_responsive_design(self):
         """Test responsive design elements"""
         print(f"\n{Fore.CYAN}Testing Responsive Design:{Style.RESET_ALL}")
         
         # Check if Tailwind CSS classes are being used
         try:
-            response = requests.get(FRONTEND_URL, timeout=5)
+            response = self._get_frontend()
             content = response.text
             
-            responsive_classes = [
-                'sm:', 'md:', 'lg:', 'xl:', '2xl:',  # Breakpoints
-                'flex', 'grid',  # Layout
-                'dark:',  # Dark mode
-                'hover:', 'focus:',  # Interactive states
-                'transition', 'animate'  # Animations
-            ]
-            
-            found_classes = []
-            for cls in responsive_classes:
-                if cls in content:
-                    found_classes.append(cls)
+            # One regex pass over the page instead of a substring scan per class
+            found = set(RESPONSIVE_PATTERN.findall(content))
+            found_classes = [cls for cls in RESPONSIVE_CLASSES if cls in found]
             
             self.log_test(
                 "Responsive Design",
@@ -232,8 +309,18 @@ class UIComponentTester:
         except Exception as e:
             self.log_test("Responsive Design", "Tailwind CSS Integration", False, str(e))
     
+    def teardown(self):
+        """Close connections held open across tests"""
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+    
     def generate_report(self):
         """Generate test report"""
+        self.flush()
         print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}UI/UX Component Test Report{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
@@ -297,22 +384,25 @@ def main():
     
     tester = UIComponentTester()
     
-    # Run all tests
-    print(f"{Fore.CYAN}Testing Backend Connectivity:{Style.RESET_ALL}")
-    if tester.test_backend_connectivity():
-        print(f"\n{Fore.CYAN}Testing API Endpoints:{Style.RESET_ALL}")
-        tester.test_api_endpoints()
+    try:
+        # Run all tests
+        print(f"{Fore.CYAN}Testing Backend Connectivity:{Style.RESET_ALL}")
+        if tester.test_backend_connectivity():
+            print(f"\n{Fore.CYAN}Testing API Endpoints:{Style.RESET_ALL}")
+            tester.test_api_endpoints()
         
-        tester.test_data_flow()
-        tester.test_websocket_connection()
-    else:
-        print(f"{Fore.RED}Backend not accessible. Please ensure the server is running on port 8000.{Style.RESET_ALL}")
+            tester.test_data_flow()
+            tester.test_websocket_connection()
+        else:
+            print(f"{Fore.RED}Backend not accessible. Please ensure the server is running on port 8000.{Style.RESET_ALL}")
     
-    tester.test_frontend_components()
-    tester.test_responsive_design()
+        tester.test_frontend_components()
+        tester.test_responsive_design()
     
-    # Generate report
-    tester.generate_report()
+        # Generate report
+        tester.generate_report()
+    finally:
+        tester.teardown()
 
 if __name__ == "__main__":
     main()
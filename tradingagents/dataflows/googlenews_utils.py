@@ -1,36 +1,258 @@
 import json
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from lxml.cssselect import CSSSelector
+from cssselect import HTMLTranslator
 from datetime import datetime
 import time
 import random
+import threading
+from collections import OrderedDict
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_exponential_jitter,
     retry_if_exception_type,
     retry_if_result,
 )
 
+# Shared session so paginated scrapes reuse the TCP/TLS connection.
+# Retries are handled by tenacity below, so the adapter itself never retries.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Recently parsed pages keyed by URL, so repeated queries (several agents
+# asking for the same ticker and window) don't hit Google again
+_CACHE_TTL = 300
+_CACHE_MAXSIZE = 512
+_page_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Pages fetched in parallel once the first page shows there is more to read.
+# Kept below the adapter pool size so every worker gets a kept-alive connection.
+_PAGE_CONCURRENCY = 4
+_page_executor = ThreadPoolExecutor(
+    max_workers=_PAGE_CONCURRENCY, thread_name_prefix="googlenews"
+)
+
+# Pages are parsed while they download; bulky elements that never hold
+# results are emptied as soon as they close so the tree stays small.
+_CHUNK_SIZE = 65536
+_DISCARD_TAGS = {"script", "style", "noscript", "svg"}
+
+
+# Selector fallback chains, most specific first, since Google changes its
+# markup frequently. Compiled once at import instead of on every lookup;
+# order matters, so each chain is tried in turn rather than as a CSS union
+# (which would return whichever element comes first in the document).
+def _css(*selectors):
+    return [CSSSelector(s, translator="html") for s in selectors]
+
+
+def _css_self(*selectors):
+    """Compile selectors that test the element itself, not its descendants"""
+    translator = HTMLTranslator()
+    return [etree.XPath(translator.css_to_xpath(s, prefix="self::")) for s in selectors]
+
+
+RESULT_SELECTORS = _css_self("div.SoaBEf", "div.Gx5Zad", "div.g", "article", "[data-hveid]")
+TITLE_SELECTORS = _css("div.MBeuO", ".MBeuO", "h3", ".LC20lb", "[role='heading']")
+SNIPPET_SELECTORS = _css(".GI74Re", ".st", ".s", "span")
+DATE_SELECTORS = _css(".LfVVr", ".f", "time", "[datetime]")
+SOURCE_SELECTORS = _css(".NUnG9d span", ".NUnG9d", ".fG8Fp", "cite")
+
+
+# Fields whose winning selector is pinned while a page is parsed. Google's
+# markup is uniform within a page, so the selector that last matched a field
+# is tried first and the full chain only runs on a miss. Winners live in a
+# per-page dict, so pages parsed on different worker threads never share one.
+# The last entry of each chain is a broad catch-all and is never pinned, so
+# one odd result can't shadow the specific selectors for every later row.
+_PINNED_FIELDS = ("title", "snippet", "date", "source")
+
+
+def _pick(el, winners, field, selectors):
+    """Return the first element matched by the highest-priority selector,
+    trying the field's last winning selector first"""
+    winner = winners[field]
+    if winner is not None:
+        matches = winner(el)
+        if matches:
+            return matches[0]
+    for selector in selectors:
+        if selector is winner:
+            continue
+        matches = selector(el)
+        if matches:
+            winners[field] = selector if selector is not selectors[-1] else None
+            return matches[0]
+    return None
+
+
+def _text(el):
+    return "".join(el.itertext()).strip()
+
 
 def is_rate_limited(response):
     """Check if the response indicates rate limiting (status code 429)"""
-    return response.status_code == 429
+    if response.status_code == 429:
+        # Streamed body is never read; hand the connection back to the pool
+        response.close()
+        return True
+    return False
 
 
 @retry(
     retry=(retry_if_result(is_rate_limited)),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
+    wait=wait_exponential_jitter(initial=4, max=60),
     stop=stop_after_attempt(5),
 )
 def make_request(url, headers):
     """Make a request with retry logic for rate limiting"""
     # Random delay before each request to avoid detection
-    time.sleep(random.uniform(2, 6))
-    response = requests.get(url, headers=headers)
+    time.sleep(random.uniform(1, 3))
+    response = _session.get(url, headers=headers, timeout=10, stream=True)
     return response
 
 
+def _cache_get(url):
+    """Return a fresh cached page for url, or None"""
+    with _cache_lock:
+        entry = _page_cache.get(url)
+        if entry is None:
+            return None
+        page, fetched_at = entry
+        if time.monotonic() - fetched_at > _CACHE_TTL:
+            del _page_cache[url]
+            return None
+        _page_cache.move_to_end(url)
+        return page
+
+
+def _cache_put(url, page):
+    """Store a parsed page, evicting the least recently used"""
+    with _cache_lock:
+        _page_cache[url] = (page, time.monotonic())
+        _page_cache.move_to_end(url)
+        while len(_page_cache) > _CACHE_MAXSIZE:
+            _page_cache.popitem(last=False)
+
+
+def _search_url(query, start_date, end_date, page):
+    """Build the Google News search URL for a results page"""
+    return (
+        f"https://www.google.com/search?q={query}"
+        f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
+        f"&tbm=nws&start={page * 10}"
+    )
+
+
+def _extract_result(el, winners):
+    """Extract a single news result from its container element, or None"""
+    try:
+        # Extract link with fallback
+        link_el = next(el.iterdescendants("a"), None)
+        link = link_el.get("href") if link_el is not None and link_el.get("href") else "No link"
+
+        title_el = _pick(el, winners, "title", TITLE_SELECTORS)
+        title = _text(title_el) if title_el is not None else "No title"
+
+        snippet_el = _pick(el, winners, "snippet", SNIPPET_SELECTORS)
+        snippet = _text(snippet_el) if snippet_el is not None else "No snippet"
+
+        date_el = _pick(el, winners, "date", DATE_SELECTORS)
+        date = _text(date_el) if date_el is not None else "No date"
+
+        source_el = _pick(el, winners, "source", SOURCE_SELECTORS)
+        source = _text(source_el) if source_el is not None else "Unknown source"
+    except Exception as e:
+        print(f"Error processing result: {e}")
+        # If one of the fields is not found, skip this result
+        return None
+
+    # Only add result if we have at least a title and link
+    if title == "No title" or link == "No link":
+        return None
+    return {
+        "link": link,
+        "title": title,
+        "snippet": snippet,
+        "date": date,
+        "source": source,
+    }
+
+
+def _parse_stream(response):
+    """
+    Parse a streamed results page; returns (has_results, results, has_next).
+    Result containers are extracted as soon as they close and then emptied,
+    so the full document tree is never held in memory.
+    """
+    parser = etree.HTMLPullParser(events=("end",), encoding=response.encoding or "utf-8")
+    # Extracted results and container counts per result selector
+    found = [[] for _ in RESULT_SELECTORS]
+    counts = [0] * len(RESULT_SELECTORS)
+    state = {"best": len(RESULT_SELECTORS), "has_next": False}
+    winners = dict.fromkeys(_PINNED_FIELDS)
+
+    def handle(el):
+        if el.tag in _DISCARD_TAGS:
+            el.clear(keep_tail=True)
+            return
+        if el.tag == "a" and el.get("id") == "pnnext":
+            state["has_next"] = True
+            return
+        # Selectors below the best one seen so far can no longer win
+        for rank in range(min(state["best"] + 1, len(RESULT_SELECTORS))):
+            if RESULT_SELECTORS[rank](el):
+                counts[rank] += 1
+                state["best"] = rank
+                result = _extract_result(el, winners)
+                if result is not None:
+                    found[rank].append(result)
+                # Keep it if an enclosing container may still need its content
+                enclosed = any(
+                    selector(ancestor)
+                    for ancestor in el.iterancestors()
+                    for selector in RESULT_SELECTORS[:rank + 1]
+                )
+                if not enclosed:
+                    el.clear(keep_tail=True)
+                break
+
+    with response:
+        for chunk in response.iter_content(_CHUNK_SIZE):
+            parser.feed(chunk)
+            for _, el in parser.read_events():
+                handle(el)
+    parser.close()
+    for _, el in parser.read_events():
+        handle(el)
+
+    best = state["best"]
+    if best == len(RESULT_SELECTORS):
+        return False, [], state["has_next"]
+    return counts[best] > 0, found[best], state["has_next"]
+
+
+def _fetch_page(url, headers):
+    """Fetch and parse one results page; returns (has_results, results, has_next)"""
+    # Cache hits skip the politeness delay, the round trip and the parse
+    page = _cache_get(url)
+    if page is not None:
+        return page
+    response = make_request(url, headers)
+    ok = response.status_code == 200
+    page = _parse_stream(response)
+    if ok:
+        _cache_put(url, page)
+    return page
+
+
 def getNewsData(query, start_date, end_date):
     """
     Scrape Google News search results for a given query and date range.
@@ -54,90 +276,47 @@ def getNewsData(query, start_date, end_date):
     }
 
     news_results = []
-    page = 0
-    while True:
-        offset = page * 10
-        url = (
-            f"https://www.google.com/search?q={query}"
-            f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
-            f"&tbm=nws&start={offset}"
+
+    # Probe the first page on its own; most queries fit on one page and
+    # there is no point fanning out when there is no "Next" link.
+    try:
+        has_results, results, has_next = _fetch_page(
+            _search_url(query, start_date, end_date, 0), headers
         )
+    except Exception as e:
+        print(f"Failed after multiple retries: {e}")
+        return news_results
+    if not has_results:
+        return news_results
+    news_results.extend(results)
 
-        try:
-            response = make_request(url, headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            # Try multiple selectors for news results as Google changes them frequently
-            results_on_page = (soup.select("div.SoaBEf") or 
-                              soup.select("div.Gx5Zad") or 
-                              soup.select("div.g") or
-                              soup.select("article") or
-                              soup.select("[data-hveid]"))
-
-            if not results_on_page:
-                break  # No more results found
-
-            for el in results_on_page:
-                try:
-                    # Extract link with fallback
-                    link_el = el.find("a")
-                    link = link_el["href"] if link_el and link_el.get("href") else "No link"
-                    
-                    # Extract title with multiple selector fallbacks
-                    title_el = (el.select_one("div.MBeuO") or 
-                               el.select_one(".MBeuO") or 
-                               el.select_one("h3") or 
-                               el.select_one(".LC20lb") or
-                               el.select_one("[role='heading']"))
-                    title = title_el.get_text().strip() if title_el else "No title"
-                    
-                    # Extract snippet with multiple selector fallbacks
-                    snippet_el = (el.select_one(".GI74Re") or 
-                                 el.select_one(".st") or 
-                                 el.select_one(".s") or
-                                 el.select_one("span"))
-                    snippet = snippet_el.get_text().strip() if snippet_el else "No snippet"
-                    
-                    # Extract date with multiple selector fallbacks
-                    date_el = (el.select_one(".LfVVr") or 
-                              el.select_one(".f") or 
-                              el.select_one("time") or
-                              el.select_one("[datetime]"))
-                    date = date_el.get_text().strip() if date_el else "No date"
-                    
-                    # Extract source with multiple selector fallbacks
-                    source_el = (el.select_one(".NUnG9d span") or 
-                                el.select_one(".NUnG9d") or 
-                                el.select_one(".fG8Fp") or
-                                el.select_one("cite"))
-                    source = source_el.get_text().strip() if source_el else "Unknown source"
-                    
-                    # Only add result if we have at least a title and link
-                    if title != "No title" and link != "No link":
-                        news_results.append(
-                            {
-                                "link": link,
-                                "title": title,
-                                "snippet": snippet,
-                                "date": date,
-                                "source": source,
-                            }
-                        )
-                except Exception as e:
-                    print(f"Error processing result: {e}")
-                    # If one of the fields is not found, skip this result
-                    continue
-
-            # Update the progress bar with the current count of results scraped
-
-            # Check for the "Next" link (pagination)
-            next_link = soup.find("a", id="pnnext")
-            if not next_link:
+    # Fetch the remaining pages a window at a time so their jittered
+    # delays and round trips overlap instead of adding up.
+    page = 1
+    while has_next:
+        window = range(page, page + _PAGE_CONCURRENCY)
+        futures = [
+            _page_executor.submit(
+                _fetch_page, _search_url(query, start_date, end_date, p), headers
+            )
+            for p in window
+        ]
+        for future in futures:
+            try:
+                has_results, results, has_next = future.result()
+            except Exception as e:
+                print(f"Failed after multiple retries: {e}")
+                has_next = False
                 break
-
-            page += 1
-
-        except Exception as e:
-            print(f"Failed after multiple retries: {e}")
-            break
+            if not has_results:
+                has_next = False
+                break
+            news_results.extend(results)
+            if not has_next:
+                break
+        # Pages past the end of the result set are discarded
+        for future in futures:
+            future.cancel()
+        page += _PAGE_CONCURRENCY
 
     return news_results
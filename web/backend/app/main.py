@@ -6,15 +6,20 @@ Main application entry point with middleware, routing, and WebSocket support
 
 import os
 import sys
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
 import logging
 import asyncio
@@ -30,10 +35,14 @@ from .routers import analysis, config, websocket, metrics
 # Import services
 from .services.websocket_manager import websocket_manager
 from .services.analysis_service import analysis_service
+from .services.session_manager import session_manager
 
 # Import utilities
 from .utils.performance import performance_monitor
-from .utils.security import SecurityHeaders, check_rate_limit
+from .utils.security import SecurityHeaders, check_rate_limit, rate_limiter, RedisRateLimiter, RedisError
+from .middleware.health import HealthCheckInterceptor, HEALTH_BODIES
+from .middleware.request_log import RequestLogMiddleware
+from .middleware.security import SecurityMiddleware
 
 # Add project root to Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
@@ -41,15 +50,24 @@ sys.path.insert(0, project_root)
 
 from load_env import load_env
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("web_backend.log")
-    ]
-)
+# Configure logging: records are queued on the calling thread and written
+# to the console and log file by a background listener, keeping blocking
+# I/O off the event loop
+_log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+_log_handlers = [
+    logging.StreamHandler(),
+    logging.FileHandler("web_backend.log")
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Only the message is rendered here; the listener's handlers add the rest
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -67,9 +85,23 @@ async def lifespan(app: FastAPI):
     if missing_vars:
         logger.warning(f"⚠️  Missing environment variables: {missing_vars}")
     
+    # Preload the rate limit script when limits are shared through Redis
+    if isinstance(rate_limiter, RedisRateLimiter):
+        try:
+            await rate_limiter.load_script()
+            logger.info("✅ Redis rate limiter ready")
+        except RedisError as e:
+            logger.warning(f"⚠️  Redis rate limiter unavailable, using in-memory fallback: {e}")
+    
+    # Routes use the session manager singleton directly, so start it up front
+    await session_manager.start()
+    
     yield
     
     # Shutdown
+    await session_manager.stop()
+    if isinstance(rate_limiter, RedisRateLimiter):
+        await rate_limiter.close()
     logger.info("🛑 Shutting down TradingAgents Web Backend")
 
 # Create FastAPI application
@@ -79,9 +111,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Rate limiting and security headers (pure ASGI, inside CORS so 429s are
+# still readable by the browser)
+app.add_middleware(SecurityMiddleware)
+
 # Security middleware
 app.add_middleware(
     TrustedHostMiddleware, 
@@ -91,15 +128,11 @@ app.add_middleware(
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:5173",  # Vite dev server
-        "http://127.0.0.1:5173"
-    ],
+    # Dev frontends on ports 3000 and 5173 (Vite dev server)
+    allow_origin_regex=r"^http://(localhost|127\.0\.0\.1):(3000|5173)$",
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
+    allow_headers=["Content-Type", "Authorization", "X-Request-ID"],
 )
 
 # Compression middleware
@@ -110,7 +143,7 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled errors"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -119,50 +152,91 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests"""
-    import time
-    import uuid
-    
-    # Generate request ID
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-    
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"📥 {request.method} {request.url} - Request ID: {request_id}")
-    
-    try:
-        response = await call_next(request)
-        
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(f"📤 {request.method} {request.url} - {response.status_code} - {process_time:.3f}s - Request ID: {request_id}")
-        
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
-        
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(f"💥 {request.method} {request.url} - ERROR - {process_time:.3f}s - Request ID: {request_id} - {str(e)}")
-        raise
+# Request logging middleware (outermost, so timings cover the whole stack);
+# REQUEST_LOG_SAMPLE_EVERY=1 logs every request
+app.add_middleware(
+    RequestLogMiddleware,
+    sample_every=int(os.getenv("REQUEST_LOG_SAMPLE_EVERY", "100"))
+)
 
-# Health check endpoint
-@app.get("/health", tags=["health"])
-async def health_check() -> Dict[str, Any]:
-    """Health check endpoint"""
+# Readiness checks: liveness (/health, /health/live) is served by
+# HealthCheckInterceptor (with fallback routes below); readiness aggregates subsystems behind a TTL cache
+_HEALTH_TTL = 10.0
+_health_cache: Dict[str, Any] = {"data": None, "ts": 0.0}
+_check_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="readiness")
+
+def check_openai() -> Dict[str, Any]:
+    """OpenAI credentials are configured"""
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    return {"status": "ok"}
+
+async def check_websocket() -> Dict[str, Any]:
+    """WebSocket manager is responsive"""
     return {
-        "status": "healthy",
-        "service": "TradingAgents Web Backend",
-        "version": "1.0.0",
-        "timestamp": "2025-08-28T02:39:40+05:30"
+        "status": "ok",
+        "connections": websocket_manager.get_total_connection_count()
     }
 
+def check_analysis() -> Dict[str, Any]:
+    """Analysis service has capacity for new sessions"""
+    active = len(analysis_service.active_analyses)
+    if active >= analysis_service.max_concurrent_analyses:
+        raise RuntimeError("No analysis capacity available")
+    return {"status": "ok", "active_analyses": active}
+
+# name -> (check callable, timeout in seconds); sync checks run on a thread pool
+_READINESS_CHECKS: Dict[str, Tuple[Callable[[], Any], float]] = {
+    "openai": (check_openai, 0.5),
+    "websocket": (check_websocket, 0.1),
+    "analysis": (check_analysis, 0.5)
+}
+
+async def _run_check(check: Callable[[], Any], timeout: float) -> Dict[str, Any]:
+    """Run a single readiness check, capped by its own timeout"""
+    if asyncio.iscoroutinefunction(check):
+        return await asyncio.wait_for(check(), timeout)
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(_check_executor, check), timeout)
+
+# Fallback liveness routes for callers that serve the bare ``app`` (tests,
+# ``uvicorn app.main:app``); under ``asgi_app`` the interceptor answers first
+@app.get("/health", tags=["health"])
+@app.get("/healthz", tags=["health"], include_in_schema=False)
+async def health_check() -> Response:
+    """Liveness endpoint"""
+    return Response(content=HEALTH_BODIES["/health"], media_type="application/json")
+
+@app.get("/health/live", tags=["health"])
+async def liveness_check() -> Response:
+    """Liveness endpoint"""
+    return Response(content=HEALTH_BODIES["/health/live"], media_type="application/json")
+
+@app.get("/health/ready", tags=["health"])
+async def readiness_check() -> ORJSONResponse:
+    """Readiness endpoint with cached subsystem checks"""
+    now = time.monotonic()
+    if _health_cache["data"] is None or now - _health_cache["ts"] >= _HEALTH_TTL:
+        # Checks run concurrently: latency is max(check), not the sum
+        results = await asyncio.gather(
+            *(_run_check(check, timeout) for check, timeout in _READINESS_CHECKS.values()),
+            return_exceptions=True
+        )
+        checks = {}
+        for name, result in zip(_READINESS_CHECKS, results):
+            if isinstance(result, asyncio.TimeoutError):
+                checks[name] = {"status": "degraded", "error": "timed out"}
+            elif isinstance(result, Exception):
+                checks[name] = {"status": "degraded", "error": str(result) or type(result).__name__}
+            else:
+                checks[name] = result
+        ready = all(check["status"] == "ok" for check in checks.values())
+        _health_cache["data"] = {"status": "ready" if ready else "degraded", "checks": checks}
+        _health_cache["ts"] = now
+
+    data = _health_cache["data"]
+    return ORJSONResponse(status_code=200 if data["status"] == "ready" else 503, content=data)
+
 # Root endpoint
 @app.get("/", tags=["root"])
 async def root() -> Dict[str, str]:
@@ -190,17 +264,28 @@ def setup_routers():
 # Setup routers immediately
 setup_routers()
 
+# ASGI entry point: health probes are answered before the middleware stack
+asgi_app = HealthCheckInterceptor(app)
+
 def create_app() -> FastAPI:
     """Factory function to create FastAPI app"""
     return app
 
 if __name__ == "__main__":
+    import uvicorn
     
-    # Development server configuration
+    # Server configuration: uvloop event loop and httptools parser (both
+    # ship with uvicorn[standard]). Analysis sessions and WebSocket
+    # connections live in-process, so workers default to 1; DEV=1 enables
+    # auto-reload, which requires a single worker.
+    dev_mode = os.getenv("DEV") == "1"
     config = {
         "host": "0.0.0.0",
         "port": 8001,
-        "reload": True,
+        "loop": "uvloop",
+        "http": "httptools",
+        "workers": 1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", "1")),
+        "reload": dev_mode,
         "log_level": "info"
     }
     
@@ -208,6 +293,6 @@ if __name__ == "__main__":
     logger.info(f"📚 API documentation available at http://{config['host']}:{config['port']}/docs")
     
     uvicorn.run(
-        "main:app",
+        "app.main:asgi_app",
         **config
     )
@@ -0,0 +1,58 @@
+"""
+Health check interceptor for TradingAgents Web Backend
+"""
+
+import orjson
+
+HEALTH_PAYLOAD = {
+    "status": "healthy",
+    "service": "TradingAgents Web Backend",
+    "version": "1.0.0"
+}
+
+LIVENESS_PAYLOAD = {"status": "alive"}
+
+# Probe paths answered without touching the application (constant, no I/O)
+HEALTH_BODIES = {
+    "/health": orjson.dumps(HEALTH_PAYLOAD),
+    "/healthz": orjson.dumps(HEALTH_PAYLOAD),
+    "/health/live": orjson.dumps(LIVENESS_PAYLOAD)
+}
+
+class HealthCheckInterceptor:
+    """Pure ASGI wrapper that answers health probes before the middleware stack"""
+
+    def __init__(self, app):
+        self.app = app
+        self.responses = {
+            path: (
+                [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())
+                ],
+                body
+            )
+            for path, body in HEALTH_BODIES.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.responses:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET":
+            await send({
+                "type": "http.response.start",
+                "status": 405,
+                "headers": [(b"allow", b"GET"), (b"content-length", b"0")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers, body = self.responses[scope["path"]]
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": headers
+        })
+        await send({"type": "http.response.body", "body": body})
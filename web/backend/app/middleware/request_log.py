@@ -0,0 +1,72 @@
+"""
+Request logging middleware for TradingAgents Web Backend
+"""
+
+import time
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Probe endpoints are never logged
+QUIET_PATHS = {"/health", "/healthz", "/health/live", "/health/ready"}
+
+class RequestLogMiddleware:
+    """Pure ASGI middleware that logs requests and tags them with a request ID
+
+    Only one in every ``sample_every`` requests is logged; server errors and
+    unhandled exceptions are always logged.
+    """
+
+    def __init__(self, app, sample_every: int = 100):
+        self.app = app
+        self.sample_every = max(1, sample_every)
+        self._counter = itertools.count()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Cheap unique request ID (read back as request.state.request_id)
+        seq = next(self._counter)
+        request_id = f"{time.time_ns():x}-{seq:x}"
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        path = scope["path"]
+        sampled = seq % self.sample_every == 0 and path not in QUIET_PATHS
+        start_ns = time.perf_counter_ns()
+        status_code = 500
+
+        # Log request
+        if sampled:
+            logger.info(f"📥 {scope['method']} {self._target(scope)} - Request ID: {request_id}")
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            process_time = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.error(f"💥 {scope['method']} {self._target(scope)} - ERROR - {process_time:.3f}s - Request ID: {request_id} - {str(e)}")
+            raise
+
+        # Log response
+        if sampled or status_code >= 500:
+            process_time = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.info(f"📤 {scope['method']} {self._target(scope)} - {status_code} - {process_time:.3f}s - Request ID: {request_id}")
+
+    @staticmethod
+    def _target(scope) -> str:
+        """Path plus query string, only rendered when a line is logged"""
+        if scope.get("query_string"):
+            return f"{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        return scope["path"]
@@ -2,15 +2,63 @@
 Security middleware for TradingAgents Web Backend
 """
 
+import re
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response, HTTPException
-from fastapi.responses import JSONResponse
-from ..utils.security import rate_limiter, get_client_id, SecurityHeaders
+from typing import FrozenSet, List, Tuple
+import orjson
+from ..utils.security import (
+    rate_limiter, get_client_id_cached, SecurityHeaders, LogThrottle, RedisError
+)
+from ..utils.performance import performance_monitor
 
 logger = logging.getLogger(__name__)
 
+# Paths exempt from security checks (health probes, root and API docs);
+# orchestrators poll the probes, so they must never be rate limited
+_SKIP_PATHS = frozenset((
+    "/health", "/healthz", "/health/live", "/health/ready",
+    "/", "/docs", "/openapi.json", "/redoc"
+))
+
+# Security headers encoded once as raw ASGI pairs; see refresh_security_headers()
+_SECURITY_HEADERS_RAW: List[Tuple[bytes, bytes]] = []
+_SECURITY_HEADER_NAMES: FrozenSet[bytes] = frozenset()
+
+# Rate limit rejection, encoded once since it is sent most under abuse
+_RATE_LIMIT_BODY = orjson.dumps({"detail": "Rate limit exceeded. Please try again later."})
+_RATE_LIMIT_HEADERS: List[Tuple[bytes, bytes]] = []
+
+def refresh_security_headers() -> None:
+    """Re-encode the security headers, e.g. after SecurityHeaders is patched in tests"""
+    global _SECURITY_HEADERS_RAW, _SECURITY_HEADER_NAMES, _RATE_LIMIT_HEADERS
+    _SECURITY_HEADERS_RAW = [
+        (key.lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in SecurityHeaders.get_security_headers().items()
+    ]
+    _SECURITY_HEADER_NAMES = frozenset(key for key, _ in _SECURITY_HEADERS_RAW)
+    _RATE_LIMIT_HEADERS = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_RATE_LIMIT_BODY)).encode()),
+        (b"retry-after", b"60"),
+        *_SECURITY_HEADERS_RAW
+    ]
+
+refresh_security_headers()
+
+# Rate limit categories, matched in one regex call; _ENDPOINT_TYPES is
+# indexed by the number of the matching group. The strict "analysis" rule
+# only covers starting (or retrying) an analysis; status and report reads
+# under /api/analysis fall through to "default"
+_ENDPOINT_RE = re.compile(
+    r"^(?:(/api/analysis/(?:start|[^/]+/retry)$)"
+    r"|(/ws)(?=/|$)|(/api/config)(?=/|$)|(/api/metrics)(?=/|$))"
+)
+_ENDPOINT_TYPES = (None, "analysis", "websocket", "config", "metrics")
+
+# Limiter backend failures are logged at most once a minute
+_rate_limit_error_log = LogThrottle()
+
 class SecurityMiddleware:
     """Security middleware for rate limiting and security headers"""
     
@@ -22,124 +70,68 @@ class SecurityMiddleware:
             await self.app(scope, receive, send)
             return
             
-        request = Request(scope, receive)
-        
         # Skip security checks for health endpoints
-        if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
+        if scope["path"] in _SKIP_PATHS:
             await self.app(scope, receive, send)
             return
             
         # Rate limiting
         try:
-            client_id = get_client_id(request)
-            endpoint_type = self._get_endpoint_type(request.url.path)
+            client_id = get_client_id_cached(scope)
+            endpoint_type = get_endpoint_type_cached(scope)
             
-            if not rate_limiter.is_allowed(client_id, endpoint_type):
-                response = JSONResponse(
-                    status_code=429,
-                    content={"detail": "Rate limit exceeded. Please try again later."},
-                    headers={"Retry-After": "60"}
-                )
-                await response(scope, receive, send)
+            if not await rate_limiter.is_allowed(client_id, endpoint_type):
+                await send({
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": _RATE_LIMIT_HEADERS
+                })
+                await send({"type": "http.response.body", "body": _RATE_LIMIT_BODY})
                 return
                 
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-            # Continue processing if rate limiting fails
+        except (RedisError, ConnectionError, TimeoutError) as e:
+            # Fail open if the limiter backend is down; log at most once a minute
+            performance_monitor.record_rate_limiter_error()
+            if _rate_limit_error_log.allow():
+                logger.error(
+                    f"Rate limiting error: {e} "
+                    f"({_rate_limit_error_log.dropped} similar errors suppressed)"
+                )
             
         # Process request
+        start_ns = time.perf_counter_ns()
+        
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
-                # Add security headers
-                headers = dict(message.get("headers", []))
-                security_headers = SecurityHeaders.get_security_headers()
-                
-                for key, value in security_headers.items():
-                    headers[key.encode()] = value.encode()
-                    
-                message["headers"] = list(headers.items())
+                # Add security headers, replacing any the app already set
+                # (ASGI header names are lowercase; multi-value headers are kept)
+                headers = message.get("headers", [])
+                if any(name in _SECURITY_HEADER_NAMES for name, _ in headers):
+                    headers = [
+                        header for header in headers
+                        if header[0] not in _SECURITY_HEADER_NAMES
+                    ]
+                # Add processing time header
+                process_time = (time.perf_counter_ns() - start_ns) / 1e9
+                message["headers"] = [
+                    *headers,
+                    (b"x-process-time", f"{process_time:.6f}".encode()),
+                    *_SECURITY_HEADERS_RAW
+                ]
                 
             await send(message)
             
         await self.app(scope, receive, send_wrapper)
         
-    def _get_endpoint_type(self, path: str) -> str:
-        """Determine endpoint type for rate limiting"""
-        if path.startswith("/api/analysis"):
-            return "analysis"
-        elif path.startswith("/ws"):
-            return "websocket"
-        elif path.startswith("/api/config"):
-            return "config"
-        elif path.startswith("/api/metrics"):
-            return "metrics"
-        else:
-            return "default"
-
-async def add_security_headers(request: Request, call_next: Callable) -> Response:
-    """Add security headers to all responses"""
-    start_time = time.time()
-    
-    try:
-        response = await call_next(request)
-        
-        # Add security headers
-        security_headers = SecurityHeaders.get_security_headers()
-        for key, value in security_headers.items():
-            response.headers[key] = value
-            
-        # Add processing time header
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Security middleware error: {e}")
-        # Return error response with security headers
-        response = JSONResponse(
-            status_code=500,
-            content={"detail": "Internal server error"}
-        )
-        
-        security_headers = SecurityHeaders.get_security_headers()
-        for key, value in security_headers.items():
-            response.headers[key] = value
-            
-        return response
-
-async def rate_limit_middleware(request: Request, call_next: Callable) -> Response:
-    """Rate limiting middleware"""
-    # Skip rate limiting for health endpoints
-    if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
-        return await call_next(request)
-        
-    try:
-        client_id = get_client_id(request)
-        endpoint_type = _get_endpoint_type(request.url.path)
-        
-        if not rate_limiter.is_allowed(client_id, endpoint_type):
-            return JSONResponse(
-                status_code=429,
-                content={"detail": "Rate limit exceeded. Please try again later."},
-                headers={"Retry-After": "60"}
-            )
-            
-        return await call_next(request)
-        
-    except Exception as e:
-        logger.error(f"Rate limiting middleware error: {e}")
-        return await call_next(request)
-
 def _get_endpoint_type(path: str) -> str:
     """Determine endpoint type for rate limiting"""
-    if path.startswith("/api/analysis"):
-        return "analysis"
-    elif path.startswith("/ws"):
-        return "websocket"
-    elif path.startswith("/api/config"):
-        return "config"
-    elif path.startswith("/api/metrics"):
-        return "metrics"
-    else:
-        return "default"
+    match = _ENDPOINT_RE.match(path)
+    return _ENDPOINT_TYPES[match.lastindex] if match else "default"
+
+def get_endpoint_type_cached(scope) -> str:
+    """_get_endpoint_type computed once per request and kept on the ASGI scope"""
+    endpoint_type = scope.get("_endpoint_type")
+    if endpoint_type is None:
+        endpoint_type = _get_endpoint_type(scope["path"])
+        scope["_endpoint_type"] = endpoint_type
+    return endpoint_type
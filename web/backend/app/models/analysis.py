@@ -4,11 +4,21 @@ Analysis Data Models
 Pydantic models for analysis requests, responses, and session management
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Literal
-from pydantic import BaseModel, Field, validator
+import re
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Dict, FrozenSet, List, Optional, Any, Literal
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from enum import Enum
 
+# Timestamp factory for model defaults (UTC, no local timezone lookup)
+utcnow = partial(datetime.now, timezone.utc)
+
+# Canonical ticker format, also published by /api/config/validation-rules.
+# Allows class shares and exchange suffixes (BRK.B, RELIANCE.NS) and indices (^GSPC)
+TICKER_RE = re.compile(r"^[A-Z0-9^][A-Z0-9.\-^]*$")
+TICKER_MAX_LENGTH = 20
+
 class AnalystType(str, Enum):
     """Available analyst types"""
     MARKET_ANALYST = "Market Analyst"
@@ -24,6 +34,23 @@ class AnalystType(str, Enum):
     SAFE_ANALYST = "Safe Analyst"
     PORTFOLIO_MANAGER = "Portfolio Manager"
 
+# Plain-string form of AnalystType for request models; validated as a literal
+# set membership instead of enum construction
+AnalystTypeStr = Literal[
+    "Market Analyst",
+    "Social Analyst",
+    "News Analyst",
+    "Fundamentals Analyst",
+    "Bull Researcher",
+    "Bear Researcher",
+    "Research Manager",
+    "Trader",
+    "Risky Analyst",
+    "Neutral Analyst",
+    "Safe Analyst",
+    "Portfolio Manager"
+]
+
 class AgentStatus(str, Enum):
     """Agent execution status"""
     PENDING = "pending"
@@ -45,6 +72,13 @@ class LLMProvider(str, Enum):
     ANTHROPIC = "anthropic"
     GROQ = "groq"
 
+# Accepted model names per provider
+_VALID_MODELS: Dict[LLMProvider, FrozenSet[str]] = {
+    LLMProvider.OPENAI: frozenset({'gpt-4', 'gpt-4-turbo', 'gpt-3.5-turbo'}),
+    LLMProvider.ANTHROPIC: frozenset({'claude-3-opus', 'claude-3-sonnet', 'claude-3-haiku'}),
+    LLMProvider.GROQ: frozenset({'llama2-70b-4096', 'mixtral-8x7b-32768'})
+}
+
 class LLMConfig(BaseModel):
     """LLM configuration"""
     provider: LLMProvider = Field(..., description="LLM provider")
@@ -52,70 +86,50 @@ class LLMConfig(BaseModel):
     temperature: float = Field(0.7, ge=0.0, le=2.0, description="Temperature for response generation")
     max_tokens: Optional[int] = Field(None, gt=0, description="Maximum tokens to generate")
     
-    @validator('model')
-    def validate_model(cls, v, values):
+    @model_validator(mode='after')
+    def validate_model(self):
         """Validate model name based on provider"""
-        provider = values.get('provider')
-        
-        valid_models = {
-            LLMProvider.OPENAI: ['gpt-4', 'gpt-4-turbo', 'gpt-3.5-turbo'],
-            LLMProvider.ANTHROPIC: ['claude-3-opus', 'claude-3-sonnet', 'claude-3-haiku'],
-            LLMProvider.GROQ: ['llama2-70b-4096', 'mixtral-8x7b-32768']
-        }
+        if self.model not in _VALID_MODELS.get(self.provider, frozenset()):
+            raise ValueError(f"Invalid model '{self.model}' for provider '{self.provider.value}'")
         
-        if provider and v not in valid_models.get(provider, []):
-            raise ValueError(f"Invalid model '{v}' for provider '{provider}'")
-        
-        return v
+        return self
 
 class AnalysisRequest(BaseModel):
     """Request to start a new analysis"""
-    ticker: str = Field(..., min_length=1, max_length=10, description="Stock ticker symbol")
-    trade_date: str = Field(..., description="Trade date in YYYY-MM-DD format")
-    selected_analysts: List[AnalystType] = Field(..., min_items=1, description="List of analysts to include")
+    ticker: str = Field(..., min_length=1, max_length=TICKER_MAX_LENGTH, description="Stock ticker symbol")
+    trade_date: date = Field(..., description="Trade date in YYYY-MM-DD format")
+    selected_analysts: List[AnalystTypeStr] = Field(..., min_length=1, description="List of analysts to include")
     research_depth: int = Field(1, ge=1, le=5, description="Research depth (1-5)")
     llm_config: LLMConfig = Field(..., description="LLM configuration")
     
-    @validator('ticker')
+    @field_validator('ticker')
+    @classmethod
     def validate_ticker(cls, v):
         """Validate ticker format"""
-        return v.upper().strip()
-    
-    @validator('trade_date')
-    def validate_trade_date(cls, v):
-        """Validate trade date format"""
-        try:
-            datetime.strptime(v, '%Y-%m-%d')
-            return v
-        except ValueError:
-            raise ValueError("Trade date must be in YYYY-MM-DD format")
+        v = v.upper().strip()
+        if not TICKER_RE.match(v):
+            raise ValueError("Ticker must contain only letters, digits, '.', '-' or '^'")
+        return v
     
-    @validator('selected_analysts')
+    @field_validator('selected_analysts')
+    @classmethod
     def validate_analysts(cls, v):
         """Validate analyst selection"""
-        if not v:
-            raise ValueError("At least one analyst must be selected")
-        
         # Remove duplicates while preserving order
-        seen = set()
-        unique_analysts = []
-        for analyst in v:
-            if analyst not in seen:
-                seen.add(analyst)
-                unique_analysts.append(analyst)
-        
-        return unique_analysts
+        return list(dict.fromkeys(v))
 
 class AnalysisResponse(BaseModel):
     """Response when starting an analysis"""
     session_id: str = Field(..., description="Unique session identifier")
     status: AnalysisStatus = Field(..., description="Current analysis status")
     message: str = Field(..., description="Status message")
-    created_at: datetime = Field(default_factory=datetime.now, description="Session creation timestamp")
+    created_at: datetime = Field(default_factory=utcnow, description="Session creation timestamp")
 
 class AgentStatusUpdate(BaseModel):
     """Agent status update"""
-    agent: AnalystType = Field(..., description="Agent name")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
+    agent: AnalystTypeStr = Field(..., description="Agent name")
     status: AgentStatus = Field(..., description="Agent status")
     start_time: Optional[datetime] = Field(None, description="Agent start time")
     end_time: Optional[datetime] = Field(None, description="Agent completion time")
@@ -123,6 +137,8 @@ class AgentStatusUpdate(BaseModel):
 
 class AnalysisSessionStatus(BaseModel):
     """Current analysis session status"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     session_id: str = Field(..., description="Session identifier")
     status: AnalysisStatus = Field(..., description="Overall analysis status")
     progress: float = Field(0.0, ge=0.0, le=100.0, description="Progress percentage")
@@ -135,6 +151,8 @@ class AnalysisSessionStatus(BaseModel):
 
 class ReportSection(BaseModel):
     """Individual report section"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     section_name: str = Field(..., description="Report section name")
     content: Optional[str] = Field(None, description="Report content in markdown")
     last_updated: Optional[datetime] = Field(None, description="Last update timestamp")
@@ -145,7 +163,7 @@ class AnalysisReports(BaseModel):
     session_id: str = Field(..., description="Session identifier")
     reports: Dict[str, Optional[str]] = Field(default_factory=dict, description="Report sections")
     final_trade_decision: Optional[str] = Field(None, description="Final trading decision")
-    last_updated: datetime = Field(default_factory=datetime.now, description="Last update timestamp")
+    last_updated: datetime = Field(..., description="Last update timestamp")
 
 class AnalysisSession(BaseModel):
     """Complete analysis session data"""
@@ -154,6 +172,7 @@ class AnalysisSession(BaseModel):
     status: AnalysisStatus = Field(..., description="Current status")
     progress: float = Field(0.0, ge=0.0, le=100.0, description="Progress percentage")
     agent_statuses: Dict[str, AgentStatus] = Field(default_factory=dict, description="Agent statuses")
+    current_agent: Optional[str] = Field(None, description="Currently active agent")
     reports: Dict[str, Optional[str]] = Field(default_factory=dict, description="Report sections")
     created_at: datetime = Field(..., description="Creation timestamp")
     started_at: Optional[datetime] = Field(None, description="Start timestamp")
@@ -162,15 +181,19 @@ class AnalysisSession(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     error: str = Field(..., description="Error type")
     message: str = Field(..., description="Error message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
     request_id: Optional[str] = Field(None, description="Request identifier")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Error timestamp")
+    timestamp: datetime = Field(default_factory=utcnow, description="Error timestamp")
 
 # Configuration models
 class AnalystInfo(BaseModel):
     """Information about an analyst"""
+    model_config = ConfigDict(frozen=True)
+    
     name: AnalystType = Field(..., description="Analyst name")
     description: str = Field(..., description="Analyst description")
     team: str = Field(..., description="Team name")
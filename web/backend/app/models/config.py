@@ -4,8 +4,8 @@ Configuration Data Models
 Pydantic models for application configuration and settings
 """
 
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 from .analysis import AnalystType, LLMProvider
 
 class AnalystTeamInfo(BaseModel):
@@ -17,6 +17,8 @@ class AnalystTeamInfo(BaseModel):
 
 class AnalystConfiguration(BaseModel):
     """Individual analyst configuration"""
+    model_config = ConfigDict(frozen=True)
+    
     name: AnalystType = Field(..., description="Analyst name")
     display_name: str = Field(..., description="Display name for UI")
     description: str = Field(..., description="Analyst description")
@@ -71,12 +73,12 @@ class ApplicationConfig(BaseModel):
     system: SystemConfiguration = Field(default_factory=SystemConfiguration, description="System configuration")
     ui: UIConfiguration = Field(default_factory=UIConfiguration, description="UI configuration")
     
-    class Config:
-        """Pydantic configuration"""
-        use_enum_values = True
+    model_config = ConfigDict(use_enum_values=True)
 
 class AnalystInfo(BaseModel):
     """Simplified analyst info for API responses"""
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., description="Analyst name")
     description: str = Field(..., description="Analyst description")
     team: str = Field(..., description="Team name")
@@ -91,7 +93,7 @@ class ConfigResponse(BaseModel):
     default_config: Dict[str, Any] = Field(..., description="Default configuration values")
 
 # Default configurations
-DEFAULT_ANALYST_TEAMS = [
+DEFAULT_ANALYST_TEAMS: Tuple[AnalystTeamInfo, ...] = (
     AnalystTeamInfo(
         name="Analysis Team",
         description="Market and fundamental analysis specialists",
@@ -135,9 +137,9 @@ DEFAULT_ANALYST_TEAMS = [
         color="#F59E0B",  # Amber/Gold
         analysts=[AnalystType.PORTFOLIO_MANAGER]
     )
-]
+)
 
-DEFAULT_ANALYST_CONFIGS = [
+DEFAULT_ANALYST_CONFIGS: Tuple[AnalystConfiguration, ...] = (
     AnalystConfiguration(
         name=AnalystType.MARKET_ANALYST,
         display_name="Market Analyst",
@@ -246,9 +248,9 @@ DEFAULT_ANALYST_CONFIGS = [
         icon="briefcase",
         dependencies=[AnalystType.RISKY_ANALYST, AnalystType.NEUTRAL_ANALYST, AnalystType.SAFE_ANALYST]
     )
-]
+)
 
-DEFAULT_LLM_PROVIDERS = [
+DEFAULT_LLM_PROVIDERS: Tuple[LLMProviderConfig, ...] = (
     LLMProviderConfig(
         name=LLMProvider.OPENAI,
         display_name="OpenAI",
@@ -332,4 +334,9 @@ DEFAULT_LLM_PROVIDERS = [
         api_key_required=True,
         enabled=True
     )
-]
+)
+
+# Serialized forms of the defaults, dumped once and shared across requests
+DEFAULT_ANALYST_TEAMS_DUMPED = tuple(team.model_dump(mode="json") for team in DEFAULT_ANALYST_TEAMS)
+DEFAULT_ANALYST_CONFIGS_DUMPED = tuple(config.model_dump(mode="json") for config in DEFAULT_ANALYST_CONFIGS)
+DEFAULT_LLM_PROVIDERS_DUMPED = tuple(provider.model_dump(mode="json") for provider in DEFAULT_LLM_PROVIDERS)
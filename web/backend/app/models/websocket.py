@@ -5,9 +5,10 @@ Pydantic models for real-time WebSocket communication
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union, Literal
-from pydantic import BaseModel, Field
-from .analysis import AnalystType, AgentStatus
+from typing import Annotated, Dict, List, Optional, Any, Union, Literal, get_args
+from typing_extensions import NotRequired, TypedDict
+from pydantic import BaseModel, Field, TypeAdapter
+from .analysis import AnalystType, AgentStatus, utcnow
 
 class WebSocketMessageType(str):
     """WebSocket message types"""
@@ -23,7 +24,7 @@ class WebSocketMessageType(str):
 class BaseWebSocketMessage(BaseModel):
     """Base WebSocket message"""
     type: str = Field(..., description="Message type")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Message timestamp")
+    timestamp: datetime = Field(default_factory=utcnow, description="Message timestamp")
     session_id: str = Field(..., description="Session identifier")
 
 class AgentStatusUpdateMessage(BaseWebSocketMessage):
@@ -89,12 +90,12 @@ class ConnectionAckMessage(BaseWebSocketMessage):
     """Connection acknowledgment message"""
     type: Literal["connection_ack"] = "connection_ack"
     message: str = Field("WebSocket connection established", description="Acknowledgment message")
-    server_time: datetime = Field(default_factory=datetime.now, description="Server timestamp")
+    server_time: datetime = Field(default_factory=utcnow, description="Server timestamp")
 
 class HeartbeatMessage(BaseWebSocketMessage):
     """Heartbeat/ping message"""
     type: Literal["heartbeat"] = "heartbeat"
-    server_time: datetime = Field(default_factory=datetime.now, description="Server timestamp")
+    server_time: datetime = Field(default_factory=utcnow, description="Server timestamp")
 
 class ProgressUpdateMessage(BaseWebSocketMessage):
     """Overall progress update message"""
@@ -105,20 +106,81 @@ class ProgressUpdateMessage(BaseWebSocketMessage):
     agents_total: int = Field(..., description="Total number of agents")
     estimated_completion: Optional[datetime] = Field(None, description="Estimated completion time")
 
-# Union type for all WebSocket messages
-WebSocketMessage = Union[
-    AgentStatusUpdateMessage,
-    MessageUpdateMessage,
-    ToolCallMessage,
-    ToolResultMessage,
-    ReportUpdateMessage,
-    AnalysisCompleteMessage,
-    AnalysisErrorMessage,
-    ConnectionAckMessage,
-    HeartbeatMessage,
-    ProgressUpdateMessage
+# Union type for all WebSocket messages, tagged on "type" so pydantic-core
+# dispatches straight to the matching model instead of trying each in turn
+WebSocketMessage = Annotated[
+    Union[
+        AgentStatusUpdateMessage,
+        MessageUpdateMessage,
+        ToolCallMessage,
+        ToolResultMessage,
+        ReportUpdateMessage,
+        AnalysisCompleteMessage,
+        AnalysisErrorMessage,
+        ConnectionAckMessage,
+        HeartbeatMessage,
+        ProgressUpdateMessage
+    ],
+    Field(discriminator="type")
 ]
 
+# Built once at import; both directions run in pydantic-core
+_MESSAGE_ADAPTER: TypeAdapter[WebSocketMessage] = TypeAdapter(WebSocketMessage)
+
+# The sender always holds a concrete message class, so encoding goes straight
+# to that class's serializer instead of resolving the union
+_ENCODERS = {
+    cls: cls.__pydantic_serializer__.to_json
+    for cls in get_args(get_args(WebSocketMessage)[0])
+}
+
+def encode_message(message: WebSocketMessage) -> bytes:
+    """Serialize a WebSocket message model to JSON bytes"""
+    encoder = _ENCODERS.get(type(message))
+    if encoder is None:
+        return _MESSAGE_ADAPTER.dump_json(message)
+    return encoder(message)
+
+def decode_message(data: Union[str, bytes]) -> WebSocketMessage:
+    """Parse and validate a JSON WebSocket message, dispatching on its type"""
+    return _MESSAGE_ADAPTER.validate_json(data)
+
+# Wire payloads for the high-frequency server -> client updates. These are
+# built from trusted internal state, so they are plain dicts (serialized by
+# orjson in the connection flusher) rather than validated models; the models
+# above stay as the documented schema. The flusher stamps "timestamp" with one
+# clock reading per outgoing frame.
+class AgentStatusUpdateTD(TypedDict):
+    """Agent status update payload"""
+    type: Literal["agent_status_update"]
+    timestamp: NotRequired[datetime]
+    session_id: str
+    agent: str
+    status: AgentStatus
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    progress: Optional[float]
+
+class MessageUpdateTD(TypedDict):
+    """Message/reasoning update payload"""
+    type: Literal["message_update"]
+    timestamp: NotRequired[datetime]
+    session_id: str
+    message_type: str
+    content: str
+    agent: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+
+class ReportUpdateTD(TypedDict):
+    """Report section update payload"""
+    type: Literal["report_update"]
+    timestamp: NotRequired[datetime]
+    session_id: str
+    section: str
+    content: str
+    agent: Optional[str]
+    is_final: bool
+
 class WebSocketResponse(BaseModel):
     """WebSocket response wrapper"""
     success: bool = Field(..., description="Whether the operation was successful")
@@ -130,10 +192,12 @@ class WebSocketError(BaseModel):
     type: Literal["error"] = "error"
     error_code: str = Field(..., description="Error code")
     error_message: str = Field(..., description="Error message")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Error timestamp")
+    timestamp: datetime = Field(default_factory=utcnow, description="Error timestamp")
     session_id: Optional[str] = Field(None, description="Session identifier")
 
-# Message factory functions
+# Message factory functions. Their inputs come from the server itself, so
+# they skip validation (plain dicts or model_construct); only untrusted
+# frames need decode_message()
 def create_agent_status_message(
     session_id: str,
     agent: str,
@@ -141,16 +205,17 @@ def create_agent_status_message(
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
     progress: Optional[float] = None
-) -> AgentStatusUpdateMessage:
+) -> AgentStatusUpdateTD:
     """Create agent status update message"""
-    return AgentStatusUpdateMessage(
-        session_id=session_id,
-        agent=agent,
-        status=status,
-        start_time=start_time,
-        end_time=end_time,
-        progress=progress
-    )
+    return {
+        "type": "agent_status_update",
+        "session_id": session_id,
+        "agent": agent,
+        "status": status,
+        "start_time": start_time,
+        "end_time": end_time,
+        "progress": progress
+    }
 
 def create_message_update(
     session_id: str,
@@ -158,15 +223,16 @@ def create_message_update(
     content: str,
     agent: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None
-) -> MessageUpdateMessage:
+) -> MessageUpdateTD:
     """Create message update"""
-    return MessageUpdateMessage(
-        session_id=session_id,
-        message_type=message_type,
-        content=content,
-        agent=agent,
-        metadata=metadata
-    )
+    return {
+        "type": "message_update",
+        "session_id": session_id,
+        "message_type": message_type,
+        "content": content,
+        "agent": agent,
+        "metadata": metadata
+    }
 
 def create_tool_call_message(
     session_id: str,
@@ -176,7 +242,9 @@ def create_tool_call_message(
     call_id: Optional[str] = None
 ) -> ToolCallMessage:
     """Create tool call message"""
-    return ToolCallMessage(
+    return ToolCallMessage.model_construct(
+        type="tool_call",
+        timestamp=utcnow(),
         session_id=session_id,
         tool_name=tool_name,
         args=args,
@@ -190,15 +258,16 @@ def create_report_update_message(
     content: str,
     agent: Optional[str] = None,
     is_final: bool = False
-) -> ReportUpdateMessage:
+) -> ReportUpdateTD:
     """Create report update message"""
-    return ReportUpdateMessage(
-        session_id=session_id,
-        section=section,
-        content=content,
-        agent=agent,
-        is_final=is_final
-    )
+    return {
+        "type": "report_update",
+        "session_id": session_id,
+        "section": section,
+        "content": content,
+        "agent": agent,
+        "is_final": is_final
+    }
 
 def create_analysis_complete_message(
     session_id: str,
@@ -209,7 +278,9 @@ def create_analysis_complete_message(
     successful_agents: int = 0
 ) -> AnalysisCompleteMessage:
     """Create analysis complete message"""
-    return AnalysisCompleteMessage(
+    return AnalysisCompleteMessage.model_construct(
+        type="analysis_complete",
+        timestamp=utcnow(),
         session_id=session_id,
         final_trade_decision=final_trade_decision,
         summary=summary,
@@ -226,7 +297,9 @@ def create_error_message(
     recoverable: bool = False
 ) -> AnalysisErrorMessage:
     """Create error message"""
-    return AnalysisErrorMessage(
+    return AnalysisErrorMessage.model_construct(
+        type="analysis_error",
+        timestamp=utcnow(),
         session_id=session_id,
         error_type=error_type,
         error_message=error_message,
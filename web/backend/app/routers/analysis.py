@@ -6,28 +6,56 @@ API endpoints for analysis session management and execution
 
 import uuid
 import logging
+import orjson
+from datetime import datetime, timezone
 from typing import Dict, Any, List
-from fastapi import APIRouter, HTTPException, Depends, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Request, BackgroundTasks, Response
+from pydantic import TypeAdapter
 from ..models.analysis import (
     AnalysisRequest, AnalysisResponse, AnalysisSession, 
     AnalysisStatus, AgentStatus, AnalysisReports, AnalysisSessionStatus
 )
 from ..services.analysis_service import get_analysis_service
 from ..utils.security import check_rate_limit, input_validator
+from ..utils.responses import json_response
 from ..utils.performance import performance_monitor, performance_timer
-from ..services.session_manager import SessionManager
+# Started in the application lifespan; referenced directly so polling routes
+# skip awaiting a getter on every call
+from ..services.session_manager import SessionState, session_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Status and report payloads are built from trusted session state with
+# model_construct and serialized straight to JSON bytes; response_model stays
+# for the OpenAPI schema only, since returning a Response skips FastAPI's
+# egress validation
+_SESSION_STATUS_LIST = TypeAdapter(List[AnalysisSessionStatus])
+
+def _session_status(session: SessionState) -> AnalysisSessionStatus:
+    """Status payload for a live session (trusted state, no validation)"""
+    return AnalysisSessionStatus.model_construct(
+        session_id=session.session_id,
+        status=session.status,
+        progress=session.progress,
+        agent_statuses=session.agent_statuses,
+        current_agent=session.current_agent,
+        created_at=session.created_at,
+        started_at=session.started_at,
+        completed_at=session.completed_at,
+        error_message=session.error_message
+    )
+
+# Constant acknowledgements for cancel/delete (the client reads the body as
+# JSON, so these stay 200 with a body rather than 204)
+_CANCELLED_JSON = orjson.dumps({"message": "Analysis cancelled successfully"})
+_DELETED_JSON = orjson.dumps({"message": "Session deleted successfully"})
+
 @router.post("/start", response_model=AnalysisResponse)
 async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundTasks) -> AnalysisResponse:
     """Start a new analysis session"""
     try:
-        # Get session manager
-        session_manager = await get_session_manager()
-        
         # Create new session
         session_id = session_manager.create_session(request)
         
@@ -57,34 +85,16 @@ async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundT
         logger.error(f"Error starting analysis: {e}")
         raise HTTPException(status_code=500, detail="Failed to start analysis")
 
-@router.get("/{session_id}/status", response_model=AnalysisSession)
-async def get_analysis_status(session_id: str) -> AnalysisSession:
+@router.get("/{session_id}/status", response_model=AnalysisSessionStatus)
+async def get_analysis_status(session_id: str) -> Response:
     """Get current status of an analysis session"""
     try:
-        session_manager = await get_session_manager()
         session = session_manager.get_session(session_id)
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Calculate current agent
-        current_agent = None
-        for agent, status in session.agent_statuses.items():
-            if status.value == "in_progress":
-                current_agent = agent
-                break
-        
-        return AnalysisSessionStatus(
-            session_id=session_id,
-            status=session.status,
-            progress=session.progress,
-            agent_statuses=session.agent_statuses,
-            current_agent=current_agent,
-            created_at=session.created_at,
-            started_at=session.started_at,
-            completed_at=session.completed_at,
-            error_message=session.error_message
-        )
+        return json_response(_session_status(session).model_dump_json())
         
     except HTTPException:
         raise
@@ -93,21 +103,20 @@ async def get_analysis_status(session_id: str) -> AnalysisSession:
         raise HTTPException(status_code=500, detail="Failed to retrieve analysis status")
 
 @router.get("/{session_id}/reports", response_model=AnalysisReports)
-async def get_analysis_reports(session_id: str) -> AnalysisReports:
+async def get_analysis_reports(session_id: str) -> Response:
     """Get current reports for an analysis session"""
     try:
-        session_manager = await get_session_manager()
         session = session_manager.get_session(session_id)
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        return AnalysisReports(
+        return json_response(AnalysisReports.model_construct(
             session_id=session_id,
             reports=session.reports,
             final_trade_decision=session.reports.get("final_trade_decision"),
-            last_updated=session.last_activity
-        )
+            last_updated=datetime.fromtimestamp(session.last_activity, timezone.utc)
+        ).model_dump_json())
         
     except HTTPException:
         raise
@@ -116,10 +125,9 @@ async def get_analysis_reports(session_id: str) -> AnalysisReports:
         raise HTTPException(status_code=500, detail="Failed to retrieve analysis reports")
 
 @router.post("/{session_id}/cancel")
-async def cancel_analysis(session_id: str) -> Dict[str, str]:
+async def cancel_analysis(session_id: str) -> Response:
     """Cancel a running analysis session"""
     try:
-        session_manager = await get_session_manager()
         session = session_manager.get_session(session_id)
         
         if not session:
@@ -140,7 +148,7 @@ async def cancel_analysis(session_id: str) -> Dict[str, str]:
         
         logger.info(f"Cancelled analysis session {session_id}")
         
-        return {"message": f"Analysis {session_id} cancelled successfully"}
+        return json_response(_CANCELLED_JSON)
         
     except HTTPException:
         raise
@@ -149,10 +157,9 @@ async def cancel_analysis(session_id: str) -> Dict[str, str]:
         raise HTTPException(status_code=500, detail="Failed to cancel analysis")
 
 @router.delete("/{session_id}")
-async def delete_analysis_session(session_id: str) -> Dict[str, str]:
+async def delete_analysis_session(session_id: str) -> Response:
     """Delete an analysis session"""
     try:
-        session_manager = await get_session_manager()
         session = session_manager.get_session(session_id)
         
         if not session:
@@ -168,7 +175,7 @@ async def delete_analysis_session(session_id: str) -> Dict[str, str]:
         
         logger.info(f"Deleted analysis session {session_id}")
         
-        return {"message": f"Session {session_id} deleted successfully"}
+        return json_response(_DELETED_JSON)
         
     except HTTPException:
         raise
@@ -177,35 +184,16 @@ async def delete_analysis_session(session_id: str) -> Dict[str, str]:
         raise HTTPException(status_code=500, detail="Failed to delete session")
 
 @router.get("/", response_model=List[AnalysisSessionStatus])
-async def list_analysis_sessions() -> List[AnalysisSessionStatus]:
+async def list_analysis_sessions() -> Response:
     """List all analysis sessions"""
     try:
-        session_manager = await get_session_manager()
-        sessions = session_manager.get_all_sessions()
-        
-        # Convert to status responses
-        session_statuses = []
-        for session_model in sessions:
-            # Calculate current agent
-            current_agent = None
-            for agent, status in session_model.agent_statuses.items():
-                if status.value == "in_progress":
-                    current_agent = agent
-                    break
-            
-            session_statuses.append(AnalysisSessionStatus(
-                session_id=session_model.session_id,
-                status=session_model.status,
-                progress=session_model.progress,
-                agent_statuses=session_model.agent_statuses,
-                current_agent=current_agent,
-                created_at=session_model.created_at,
-                started_at=session_model.started_at,
-                completed_at=session_model.completed_at,
-                error_message=session_model.error_message
-            ))
-        
-        return session_statuses
+        # Read the live session states directly rather than through
+        # get_all_sessions(), which validates a full AnalysisSession per entry
+        session_statuses = [
+            _session_status(session) for session in session_manager.sessions.values()
+        ]
+        
+        return json_response(_SESSION_STATUS_LIST.dump_json(session_statuses))
         
     except Exception as e:
         logger.error(f"Error listing analysis sessions: {e}")
@@ -215,7 +203,6 @@ async def list_analysis_sessions() -> List[AnalysisSessionStatus]:
 async def get_analysis_stats() -> Dict[str, Any]:
     """Get analysis statistics"""
     try:
-        session_manager = await get_session_manager()
         stats = session_manager.get_session_stats()
         
         return {
@@ -236,7 +223,6 @@ async def get_analysis_stats() -> Dict[str, Any]:
 async def retry_analysis(session_id: str) -> AnalysisResponse:
     """Retry a failed analysis session"""
     try:
-        session_manager = await get_session_manager()
         session = session_manager.get_session(session_id)
         
         if not session:
@@ -256,8 +242,8 @@ async def retry_analysis(session_id: str) -> AnalysisResponse:
         session.completed_at = None
         
         # Reset agent statuses
-        for agent in session.agent_statuses:
-            session.agent_statuses[agent] = "pending"
+        session.agent_statuses = dict.fromkeys(session.agent_statuses, AgentStatus.PENDING)
+        session.current_agent = None
         
         # Start analysis again
         analysis_service = get_analysis_service()
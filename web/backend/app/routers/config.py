@@ -5,170 +5,174 @@ API endpoints for application configuration, analyst info, and LLM providers
 """
 
 from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+import hashlib
 import logging
+import orjson
 
 from app.models.config import (
     ConfigResponse, AnalystConfiguration, LLMProviderConfig,
-    DEFAULT_ANALYST_CONFIGS, DEFAULT_LLM_PROVIDERS, DEFAULT_ANALYST_TEAMS
+    DEFAULT_ANALYST_CONFIGS, DEFAULT_LLM_PROVIDERS,
+    DEFAULT_ANALYST_CONFIGS_DUMPED, DEFAULT_LLM_PROVIDERS_DUMPED, DEFAULT_ANALYST_TEAMS_DUMPED
 )
-from app.models.analysis import AnalystType, LLMProvider
+from app.models.analysis import AnalystType, LLMProvider, TICKER_RE, TICKER_MAX_LENGTH
+from app.utils.responses import json_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _build_full_configuration() -> ConfigResponse:
+    """Build the complete application configuration from the static defaults"""
+    # Convert analyst configs to AnalystInfo format for response
+    analyst_infos = []
+    for config in DEFAULT_ANALYST_CONFIGS:
+        analyst_infos.append({
+            "name": config.name,
+            "description": config.description,
+            "team": config.team,
+            "color": config.color
+        })
+    
+    # Extract LLM providers
+    llm_providers = [provider.name for provider in DEFAULT_LLM_PROVIDERS]
+    
+    # Build models dict
+    models_dict = {}
+    for provider_config in DEFAULT_LLM_PROVIDERS:
+        models_dict[provider_config.name.value] = [
+            model.name for model in provider_config.models
+        ]
+    
+    return ConfigResponse(
+        analysts=analyst_infos,
+        llm_providers=llm_providers,
+        models=models_dict,
+        max_research_depth=5,
+        default_config={
+            "temperature": 0.7,
+            "max_tokens": None,
+            "research_depth": 1,
+            "selected_analysts": ["Market Analyst", "Social Analyst"],
+            "llm_provider": "openai",
+            "llm_model": "gpt-4"
+        }
+    )
+
+def _build_default_configuration() -> Dict[str, Any]:
+    """Default values for a new analysis request"""
+    return {
+        "ticker": "TSLA",
+        "trade_date": "2025-01-15",
+        "selected_analysts": [
+            AnalystType.MARKET_ANALYST.value,
+            AnalystType.SOCIAL_ANALYST.value,
+            AnalystType.FUNDAMENTALS_ANALYST.value
+        ],
+        "research_depth": 1,
+        "llm_config": {
+            "provider": LLMProvider.OPENAI.value,
+            "model": "gpt-4",
+            "temperature": 0.7,
+            "max_tokens": None
+        }
+    }
+
+def _build_validation_rules() -> Dict[str, Any]:
+    """Validation rules for configuration"""
+    return {
+        "ticker": {
+            "min_length": 1,
+            "max_length": TICKER_MAX_LENGTH,
+            "pattern": TICKER_RE.pattern,
+            "description": "Stock ticker symbol (uppercase letters and digits, with optional '.', '-' or '^', e.g. BRK.B, RELIANCE.NS)"
+        },
+        "trade_date": {
+            "format": "YYYY-MM-DD",
+            "description": "Trade date in ISO format"
+        },
+        "selected_analysts": {
+            "min_items": 1,
+            "max_items": len(AnalystType),
+            "available_options": [analyst.value for analyst in AnalystType],
+            "description": "List of analysts to include in analysis"
+        },
+        "research_depth": {
+            "minimum": 1,
+            "maximum": 5,
+            "description": "Research depth level (1=basic, 5=comprehensive)"
+        },
+        "llm_config": {
+            "temperature": {
+                "minimum": 0.0,
+                "maximum": 2.0,
+                "description": "LLM temperature for response generation"
+            },
+            "max_tokens": {
+                "minimum": 1,
+                "maximum": 200000,
+                "description": "Maximum tokens to generate (optional)"
+            }
+        }
+    }
+
+# Every payload here is derived from static defaults, so each is serialized
+# once at import and served as raw bytes
+_ANALYSTS_JSON = orjson.dumps(DEFAULT_ANALYST_CONFIGS_DUMPED)
+_LLM_PROVIDERS_JSON = orjson.dumps(DEFAULT_LLM_PROVIDERS_DUMPED)
+_TEAMS_JSON = orjson.dumps(DEFAULT_ANALYST_TEAMS_DUMPED)
+_MODELS_JSON: Dict[str, bytes] = {
+    provider_config["name"]: orjson.dumps({
+        "provider": provider_config["name"],
+        "models": provider_config["models"],
+        "enabled": provider_config["enabled"]
+    })
+    for provider_config in DEFAULT_LLM_PROVIDERS_DUMPED
+}
+_CONFIG_JSON = orjson.dumps(_build_full_configuration().model_dump(mode="json"))
+_CONFIG_ETAG = f'"{hashlib.blake2b(_CONFIG_JSON).hexdigest()[:16]}"'
+_DEFAULTS_JSON = orjson.dumps(_build_default_configuration())
+_VALIDATION_RULES_JSON = orjson.dumps(_build_validation_rules())
+
+# Cached bodies go out through json_response; response_model is schema only
 @router.get("/analysts", response_model=List[AnalystConfiguration])
-async def get_analysts() -> List[AnalystConfiguration]:
+async def get_analysts() -> Response:
     """Get available analysts configuration"""
-    try:
-        return DEFAULT_ANALYST_CONFIGS
-    except Exception as e:
-        logger.error(f"Error getting analysts: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve analysts")
+    return json_response(_ANALYSTS_JSON)
 
 @router.get("/llm-providers", response_model=List[LLMProviderConfig])
-async def get_llm_providers() -> List[LLMProviderConfig]:
+async def get_llm_providers() -> Response:
     """Get available LLM providers"""
-    try:
-        return DEFAULT_LLM_PROVIDERS
-    except Exception as e:
-        logger.error(f"Error getting LLM providers: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve LLM providers")
+    return json_response(_LLM_PROVIDERS_JSON)
 
 @router.get("/models/{provider}")
-async def get_models_for_provider(provider: LLMProvider) -> Dict[str, Any]:
+async def get_models_for_provider(provider: LLMProvider) -> Response:
     """Get available models for a specific LLM provider"""
-    try:
-        for provider_config in DEFAULT_LLM_PROVIDERS:
-            if provider_config.name == provider:
-                return {
-                    "provider": provider.value,
-                    "models": [model.dict() for model in provider_config.models],
-                    "enabled": provider_config.enabled
-                }
-        
+    body = _MODELS_JSON.get(provider.value)
+    if body is None:
         raise HTTPException(status_code=404, detail=f"Provider {provider} not found")
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting models for provider {provider}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve models")
+    return json_response(body)
 
 @router.get("/teams")
-async def get_analyst_teams() -> List[Dict[str, Any]]:
+async def get_analyst_teams() -> Response:
     """Get analyst team configurations"""
-    try:
-        return [team.dict() for team in DEFAULT_ANALYST_TEAMS]
-    except Exception as e:
-        logger.error(f"Error getting analyst teams: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve analyst teams")
+    return json_response(_TEAMS_JSON)
 
 @router.get("/", response_model=ConfigResponse)
-async def get_full_configuration() -> ConfigResponse:
+async def get_full_configuration(request: Request) -> Response:
     """Get complete application configuration"""
-    try:
-        # Convert analyst configs to AnalystInfo format for response
-        analyst_infos = []
-        for config in DEFAULT_ANALYST_CONFIGS:
-            analyst_infos.append({
-                "name": config.name,
-                "description": config.description,
-                "team": config.team,
-                "color": config.color
-            })
-        
-        # Extract LLM providers
-        llm_providers = [provider.name for provider in DEFAULT_LLM_PROVIDERS]
-        
-        # Build models dict
-        models_dict = {}
-        for provider_config in DEFAULT_LLM_PROVIDERS:
-            models_dict[provider_config.name.value] = [
-                model.name for model in provider_config.models
-            ]
-        
-        return ConfigResponse(
-            analysts=analyst_infos,
-            llm_providers=llm_providers,
-            models=models_dict,
-            max_research_depth=5,
-            default_config={
-                "temperature": 0.7,
-                "max_tokens": None,
-                "research_depth": 1,
-                "selected_analysts": ["Market Analyst", "Social Analyst"],
-                "llm_provider": "openai",
-                "llm_model": "gpt-4"
-            }
-        )
-    except Exception as e:
-        logger.error(f"Error getting full configuration: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve configuration")
+    headers = {"ETag": _CONFIG_ETAG, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _CONFIG_ETAG in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(_CONFIG_JSON, media_type="application/json", headers=headers)
 
 @router.get("/defaults")
-async def get_default_configuration() -> Dict[str, Any]:
+async def get_default_configuration() -> Response:
     """Get default configuration values"""
-    try:
-        return {
-            "ticker": "TSLA",
-            "trade_date": "2025-01-15",
-            "selected_analysts": [
-                AnalystType.MARKET_ANALYST.value,
-                AnalystType.SOCIAL_ANALYST.value,
-                AnalystType.FUNDAMENTALS_ANALYST.value
-            ],
-            "research_depth": 1,
-            "llm_config": {
-                "provider": LLMProvider.OPENAI.value,
-                "model": "gpt-4",
-                "temperature": 0.7,
-                "max_tokens": None
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error getting default configuration: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve default configuration")
+    return json_response(_DEFAULTS_JSON)
 
 @router.get("/validation-rules")
-async def get_validation_rules() -> Dict[str, Any]:
+async def get_validation_rules() -> Response:
     """Get validation rules for configuration"""
-    try:
-        return {
-            "ticker": {
-                "min_length": 1,
-                "max_length": 10,
-                "pattern": "^[A-Z]+$",
-                "description": "Stock ticker symbol (uppercase letters only)"
-            },
-            "trade_date": {
-                "format": "YYYY-MM-DD",
-                "description": "Trade date in ISO format"
-            },
-            "selected_analysts": {
-                "min_items": 1,
-                "max_items": len(AnalystType),
-                "available_options": [analyst.value for analyst in AnalystType],
-                "description": "List of analysts to include in analysis"
-            },
-            "research_depth": {
-                "minimum": 1,
-                "maximum": 5,
-                "description": "Research depth level (1=basic, 5=comprehensive)"
-            },
-            "llm_config": {
-                "temperature": {
-                    "minimum": 0.0,
-                    "maximum": 2.0,
-                    "description": "LLM temperature for response generation"
-                },
-                "max_tokens": {
-                    "minimum": 1,
-                    "maximum": 200000,
-                    "description": "Maximum tokens to generate (optional)"
-                }
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error getting validation rules: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve validation rules")
+    return json_response(_VALIDATION_RULES_JSON)
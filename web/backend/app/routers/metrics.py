@@ -2,7 +2,8 @@
 Performance metrics API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any
 import psutil
 import time
@@ -11,8 +12,23 @@ from ..utils.security import check_rate_limit
 
 router = APIRouter()
 
+# psutil.virtual_memory() parses /proc/meminfo; polled dashboards reuse a
+# reading for MEMORY_CACHE_TTL seconds
+MEMORY_CACHE_TTL = 0.5
+_memory_cache = (0.0, None)
+
+def _cached_virtual_memory():
+    """psutil.virtual_memory(), cached for MEMORY_CACHE_TTL seconds"""
+    global _memory_cache
+    now = time.monotonic()
+    read_at, memory = _memory_cache
+    if memory is None or now - read_at > MEMORY_CACHE_TTL:
+        memory = psutil.virtual_memory()
+        _memory_cache = (now, memory)
+    return memory
+
 @router.get("/performance")
-async def get_performance_metrics() -> Dict[str, Any]:
+async def get_performance_metrics() -> Response:
     """Get current performance metrics"""
     try:
         # Get basic performance metrics
@@ -20,7 +36,7 @@ async def get_performance_metrics() -> Dict[str, Any]:
         
         # Add system memory usage if available
         try:
-            memory = psutil.virtual_memory()
+            memory = _cached_virtual_memory()
             metrics['memoryUsage'] = {
                 'used': memory.used,
                 'total': memory.total,
@@ -30,7 +46,7 @@ async def get_performance_metrics() -> Dict[str, Any]:
             # psutil might not be available, skip memory metrics
             pass
             
-        return {
+        return ORJSONResponse({
             "websocketConnections": metrics['websocket_connections'],
             "activeSessions": metrics['active_sessions'],
             "messageRatePerSecond": metrics['message_rate_per_second'],
@@ -38,9 +54,10 @@ async def get_performance_metrics() -> Dict[str, Any]:
             "averageResponseTimeMs": metrics['average_response_time_ms'],
             "totalMessagesInWindow": metrics['total_messages_in_window'],
             "totalErrorsInWindow": metrics['total_errors_in_window'],
+            "rateLimiterErrorsTotal": metrics['rate_limiter_errors_total'],
             "memoryUsage": metrics.get('memoryUsage'),
             "timestamp": time.time()
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get performance metrics: {str(e)}")
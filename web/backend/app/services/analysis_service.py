@@ -9,8 +9,8 @@ import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, Any, Optional, AsyncGenerator
-import threading
+from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator
+from functools import partial
 from concurrent.futures import ThreadPoolExecutor
 import queue
 
@@ -20,18 +20,58 @@ sys.path.insert(0, project_root)
 
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
-from ..models.analysis import AnalysisRequest, AnalysisStatus, AgentStatus
+from ..models.analysis import AnalysisRequest, AnalysisStatus, AgentStatus, utcnow
 from ..models.websocket import (
     AgentStatusUpdateMessage, MessageUpdateMessage, ToolCallMessage, ReportUpdateMessage, 
     AnalysisCompleteMessage, AnalysisErrorMessage,
     create_agent_status_message, create_message_update, create_report_update_message, 
     create_analysis_complete_message, create_error_message
 )
-from .websocket_manager import get_websocket_manager
+from .websocket_manager import OutboundMessage, get_websocket_manager
 from .session_manager import get_session_manager
 
 logger = logging.getLogger(__name__)
 
+# Report sections in broadcast order, with the agent that writes each one
+REPORT_AGENTS = {
+    "market_report": "Market Analyst",
+    "sentiment_report": "Social Analyst",
+    "news_report": "News Analyst",
+    "fundamentals_report": "Fundamentals Analyst",
+    "investment_plan": "Research Manager",
+    "trader_investment_plan": "Trader",
+    "final_trade_decision": "Portfolio Manager"
+}
+
+# Keyword fallback for attributing a message to an agent, in priority order:
+# the first agent with any keyword in the content wins
+AGENT_KEYWORDS = {
+    "Market Analyst": ["market", "price", "technical", "chart"],
+    "Social Analyst": ["social", "sentiment", "twitter", "reddit"],
+    "News Analyst": ["news", "article", "headline", "event"],
+    "Fundamentals Analyst": ["financial", "earnings", "revenue", "balance"],
+    "Bull Researcher": ["bullish", "positive", "buy", "upside"],
+    "Bear Researcher": ["bearish", "negative", "sell", "downside"],
+    "Research Manager": ["research", "analysis", "conclusion"],
+    "Trader": ["trade", "position", "strategy", "execution"],
+    "Portfolio Manager": ["portfolio", "allocation", "decision"]
+}
+
+# Flattened once; walking (keyword, agent) pairs keeps the priority order
+_AGENT_KEYWORD_PAIRS = tuple(
+    (keyword, agent)
+    for agent, keywords in AGENT_KEYWORDS.items()
+    for keyword in keywords
+)
+
+def _agent_for_content(content: str) -> Optional[str]:
+    """Keyword fallback for messages without a sender name"""
+    content = content.lower()
+    for keyword, agent in _AGENT_KEYWORD_PAIRS:
+        if keyword in content:
+            return agent
+    return None
+
 class AnalysisStreamHandler:
     """Handles streaming analysis results and WebSocket broadcasting"""
     
@@ -41,6 +81,19 @@ class AnalysisStreamHandler:
         self.session_manager = None
         self.current_agent = None
         self.agent_start_times: Dict[str, datetime] = {}
+        # Last status sent per agent, so repeated transitions are skipped
+        self.agent_statuses: Dict[str, AgentStatus] = {}
+        # Outbound messages produced while handling one chunk, sent together
+        self._pending: List[OutboundMessage] = []
+        # Last content sent per report section; streamed state often echoes it
+        self._sent_reports: Dict[str, str] = {}
+        # Agent attributed to each message, by message id. Every chunk carries
+        # the whole message history, so earlier messages come back each time;
+        # keying on the id keeps no message text alive
+        self._message_agents: Dict[str, Optional[str]] = {}
+        # Whether anyone is connected for the chunk being handled; when not,
+        # session state is still updated but no messages are built
+        self._listening = True
         
     async def initialize(self):
         """Initialize managers"""
@@ -49,13 +102,15 @@ class AnalysisStreamHandler:
         
     async def handle_chunk(self, chunk: Dict[str, Any]):
         """Process a single chunk from the analysis stream"""
+        self._listening = self.websocket_manager.has_session_connections(self.session_id)
         try:
             # Extract messages
+            last_agent = None
             if "messages" in chunk and len(chunk["messages"]) > 0:
-                await self._handle_messages(chunk["messages"])
+                last_agent = await self._handle_messages(chunk["messages"])
                 
             # Handle agent status updates
-            await self._handle_agent_status(chunk)
+            await self._handle_agent_status(chunk, last_agent)
             
             # Handle report updates
             await self._handle_reports(chunk)
@@ -63,154 +118,180 @@ class AnalysisStreamHandler:
         except Exception as e:
             logger.error(f"Error handling chunk in session {self.session_id}: {e}")
             await self._broadcast_error("chunk_processing_error", str(e))
+        finally:
+            await self._flush_pending()
+            
+    async def _flush_pending(self):
+        """Broadcast everything queued for the current chunk in one pass"""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            await self.websocket_manager.broadcast_batch_to_session(self.session_id, pending)
             
-    async def _handle_messages(self, messages: list):
-        """Handle message updates from chunk"""
+    async def _handle_messages(self, messages: list) -> Optional[str]:
+        """Handle message updates from chunk; returns the last message's agent"""
+        if not self._listening:
+            # Only the last message's agent is needed for status tracking
+            messages = messages[-1:]
+            
+        agent = None
         for message in messages:
+            agent = None
             try:
                 content = self._extract_content_string(message.content)
                 message_type = getattr(message, 'type', 'Unknown')
                 
                 # Determine agent from message context
-                agent = self._determine_agent_from_message(message)
-                
-                # Create and broadcast message update
-                ws_message = create_message_update(
-                    session_id=self.session_id,
-                    message_type=message_type,
-                    content=content,
-                    agent=agent
-                )
+                agent = self._agent_for_message(message, content)
                 
-                await self.websocket_manager.broadcast_to_session(
-                    self.session_id, ws_message.dict()
-                )
+                # Create and queue message update
+                if self._listening:
+                    self._pending.append(create_message_update(
+                        session_id=self.session_id,
+                        message_type=message_type,
+                        content=content,
+                        agent=agent
+                    ))
                 
             except Exception as e:
                 logger.warning(f"Error processing message: {e}")
                 
-    async def _handle_agent_status(self, chunk: Dict[str, Any]):
+        return agent
+                
+    async def _handle_agent_status(self, chunk: Dict[str, Any], last_agent: Optional[str] = None):
         """Handle agent status updates from chunk"""
-        # Check for specific agent completions based on report presence
-        agent_reports = {
-            "market_report": "Market Analyst",
-            "sentiment_report": "Social Analyst", 
-            "news_report": "News Analyst",
-            "fundamentals_report": "Fundamentals Analyst",
-            "investment_plan": "Research Manager",
-            "trader_investment_plan": "Trader",
-            "final_trade_decision": "Portfolio Manager"
-        }
+        updates: List[Tuple[str, AgentStatus]] = []
         
-        for report_key, agent_name in agent_reports.items():
+        # Check for specific agent completions based on report presence
+        for report_key, agent_name in REPORT_AGENTS.items():
             if report_key in chunk:
                 # Agent completed
-                await self._update_agent_status(agent_name, AgentStatus.COMPLETED)
+                updates.append((agent_name, AgentStatus.COMPLETED))
                 
-        # Handle current agent detection from messages
-        if "messages" in chunk and chunk["messages"]:
-            last_message = chunk["messages"][-1]
-            agent = self._determine_agent_from_message(last_message)
-            if agent and agent != self.current_agent:
-                # New agent started
-                if self.current_agent:
-                    await self._update_agent_status(self.current_agent, AgentStatus.COMPLETED)
-                await self._update_agent_status(agent, AgentStatus.IN_PROGRESS)
-                self.current_agent = agent
+        # Handle current agent detection (the last message was already
+        # classified while handling messages)
+        agent = last_agent
+        if agent and agent != self.current_agent:
+            # New agent started
+            if self.current_agent:
+                updates.append((self.current_agent, AgentStatus.COMPLETED))
+            updates.append((agent, AgentStatus.IN_PROGRESS))
+            self.current_agent = agent
+            
+        if updates:
+            await self._update_agent_statuses(updates)
                 
     async def _handle_reports(self, chunk: Dict[str, Any]):
         """Handle report updates from chunk"""
-        report_sections = [
-            "market_report", "sentiment_report", "news_report", 
-            "fundamentals_report", "investment_plan", "trader_investment_plan",
-            "final_trade_decision"
-        ]
+        changed: Dict[str, str] = {}
         
-        for section in report_sections:
+        for section in REPORT_AGENTS:
             if section in chunk:
                 content = chunk[section]
-                if content:
-                    # Update session
-                    await self.session_manager.update_report_section(
-                        self.session_id, section, content
-                    )
+                if content and self._sent_reports.get(section) != content:
+                    self._sent_reports[section] = content
+                    changed[section] = content
                     
-                    # Broadcast update
-                    ws_message = create_report_update_message(
-                        session_id=self.session_id,
-                        section=section,
-                        content=content,
-                        agent=self._get_agent_for_report(section),
-                        is_final=section == "final_trade_decision"
-                    )
-                    
-                    await self.websocket_manager.broadcast_to_session(
-                        self.session_id, ws_message.dict()
-                    )
+                    # Queue update
+                    if self._listening:
+                        self._pending.append(create_report_update_message(
+                            session_id=self.session_id,
+                            section=section,
+                            content=content,
+                            agent=self._get_agent_for_report(section),
+                            is_final=section == "final_trade_decision"
+                        ))
                     
-    async def _update_agent_status(self, agent: str, status: AgentStatus):
-        """Update agent status and broadcast"""
-        # Track timing
-        now = datetime.now()
-        start_time = None
-        end_time = None
-        
-        if status == AgentStatus.IN_PROGRESS:
-            self.agent_start_times[agent] = now
-            start_time = now
-        elif status in [AgentStatus.COMPLETED, AgentStatus.FAILED]:
-            start_time = self.agent_start_times.get(agent)
-            end_time = now
-            
         # Update session
-        await self.session_manager.update_agent_status(self.session_id, agent, status)
+        if changed:
+            await self.session_manager.update_report_sections(self.session_id, changed)
+            
+    async def _update_agent_statuses(self, updates: List[Tuple[str, AgentStatus]]):
+        """Apply a chunk's agent transitions in one session update and queue them
         
-        # Broadcast update
-        ws_message = create_agent_status_message(
-            session_id=self.session_id,
-            agent=agent,
-            status=status,
-            start_time=start_time,
-            end_time=end_time
-        )
+        Transitions to the status an agent already has (report sections are
+        echoed in later chunks) are dropped.
+        """
+        # One clock reading for every transition in this chunk
+        now = utcnow()
+        changed = []
         
-        await self.websocket_manager.broadcast_to_session(
-            self.session_id, ws_message.dict()
-        )
+        for agent, status in updates:
+            if self.agent_statuses.get(agent) is status:
+                continue
+            self.agent_statuses[agent] = status
+            changed.append((agent, status))
+            
+            # Track timing
+            start_time = None
+            end_time = None
+            
+            if status == AgentStatus.IN_PROGRESS:
+                self.agent_start_times[agent] = now
+                start_time = now
+            elif status in [AgentStatus.COMPLETED, AgentStatus.FAILED]:
+                start_time = self.agent_start_times.get(agent)
+                end_time = now
+                
+            # Queue update
+            if self._listening:
+                self._pending.append(create_agent_status_message(
+                    session_id=self.session_id,
+                    agent=agent,
+                    status=status,
+                    start_time=start_time,
+                    end_time=end_time
+                ))
+            
+        # Update session
+        if changed:
+            await self.session_manager.update_agent_statuses(self.session_id, changed)
         
     async def _broadcast_error(self, error_type: str, error_message: str, agent: Optional[str] = None):
-        """Broadcast error message"""
-        ws_message = create_error_message(
+        """Broadcast error message after anything already queued"""
+        self._pending.append(create_error_message(
             session_id=self.session_id,
             error_type=error_type,
             error_message=error_message,
             agent=agent
-        )
-        
-        await self.websocket_manager.broadcast_to_session(
-            self.session_id, ws_message.dict()
-        )
+        ))
+        await self._flush_pending()
         
     def _extract_content_string(self, content) -> str:
         """Extract string content from message content"""
-        if isinstance(content, str):
+        # Plain strings are by far the common case: one identity check
+        if type(content) is str:
             return content
         elif isinstance(content, list):
             # Handle list of content blocks
-            text_parts = []
-            for item in content:
-                if isinstance(item, dict) and 'text' in item:
-                    text_parts.append(item['text'])
-                elif isinstance(item, str):
-                    text_parts.append(item)
-            return ' '.join(text_parts)
+            return ' '.join([
+                item if isinstance(item, str) else item['text']
+                for item in content
+                if isinstance(item, str) or (isinstance(item, dict) and 'text' in item)
+            ])
+        elif isinstance(content, str):
+            # str subclasses
+            return content
         elif hasattr(content, 'content'):
             return str(content.content)
         else:
             return str(content)
             
-    def _determine_agent_from_message(self, message) -> Optional[str]:
-        """Determine which agent sent a message"""
+    def _agent_for_message(self, message, content: str) -> Optional[str]:
+        """_determine_agent_from_message, memoized per message id"""
+        message_id = getattr(message, 'id', None)
+        if not message_id:
+            return self._determine_agent_from_message(message, content)
+        if message_id in self._message_agents:
+            return self._message_agents[message_id]
+        agent = self._determine_agent_from_message(message, content)
+        self._message_agents[message_id] = agent
+        return agent
+        
+    def _determine_agent_from_message(self, message, content: Optional[str] = None) -> Optional[str]:
+        """Determine which agent sent a message
+        
+        ``content`` is the already extracted content string, if the caller has it.
+        """
         # Try to extract from message metadata
         if hasattr(message, 'name') and message.name:
             return message.name
@@ -220,94 +301,78 @@ class AnalysisStreamHandler:
                 return name
                 
         # Fallback to content analysis
-        content = self._extract_content_string(message.content).lower()
-        
-        # Simple keyword matching
-        agent_keywords = {
-            "Market Analyst": ["market", "price", "technical", "chart"],
-            "Social Analyst": ["social", "sentiment", "twitter", "reddit"],
-            "News Analyst": ["news", "article", "headline", "event"],
-            "Fundamentals Analyst": ["financial", "earnings", "revenue", "balance"],
-            "Bull Researcher": ["bullish", "positive", "buy", "upside"],
-            "Bear Researcher": ["bearish", "negative", "sell", "downside"],
-            "Research Manager": ["research", "analysis", "conclusion"],
-            "Trader": ["trade", "position", "strategy", "execution"],
-            "Portfolio Manager": ["portfolio", "allocation", "decision"]
-        }
-        
-        for agent, keywords in agent_keywords.items():
-            if any(keyword in content for keyword in keywords):
-                return agent
-                
-        return None
+        if content is None:
+            content = self._extract_content_string(message.content)
+        return _agent_for_content(content)
         
     def _get_agent_for_report(self, section: str) -> Optional[str]:
         """Get agent responsible for report section"""
-        section_agents = {
-            "market_report": "Market Analyst",
-            "sentiment_report": "Social Analyst",
-            "news_report": "News Analyst", 
-            "fundamentals_report": "Fundamentals Analyst",
-            "investment_plan": "Research Manager",
-            "trader_investment_plan": "Trader",
-            "final_trade_decision": "Portfolio Manager"
-        }
-        return section_agents.get(section)
+        return REPORT_AGENTS.get(section)
 
 class AnalysisService:
-    """Thread-safe analysis service"""
+    """Runs analyses as event-loop tasks streaming the graph asynchronously"""
     
     def __init__(self, max_concurrent_analyses: int = 5):
         self.max_concurrent_analyses = max_concurrent_analyses
+        # Only graph construction (LLM clients, memory stores) runs here
         self.executor = ThreadPoolExecutor(max_workers=max_concurrent_analyses)
-        self.active_analyses: Dict[str, threading.Event] = {}
-        self.analysis_lock = asyncio.Lock()
+        # Admission and cleanup never await, so the dict needs no lock
+        self.active_analyses: Dict[str, asyncio.Task] = {}
         
     async def start_analysis(self, session_id: str, request: AnalysisRequest) -> bool:
         """Start analysis for a session"""
-        async with self.analysis_lock:
-            if len(self.active_analyses) >= self.max_concurrent_analyses:
-                logger.warning(f"Maximum concurrent analyses reached, rejecting session {session_id}")
-                return False
-                
-            # Create cancellation event
-            cancel_event = threading.Event()
-            self.active_analyses[session_id] = cancel_event
+        if len(self.active_analyses) >= self.max_concurrent_analyses:
+            logger.warning(f"Maximum concurrent analyses reached, rejecting session {session_id}")
+            return False
             
-        # Start analysis in background
-        asyncio.create_task(self._run_analysis(session_id, request, cancel_event))
+        # Start analysis in background; the task doubles as the cancel handle.
+        # The done callback frees the slot even if the task is cancelled
+        # before its coroutine ever runs
+        task = asyncio.create_task(self._run_analysis(session_id, request))
+        self.active_analyses[session_id] = task
+        task.add_done_callback(partial(self._forget_analysis, session_id))
         return True
         
+    def _forget_analysis(self, session_id: str, task: asyncio.Task):
+        """Drop a finished analysis, unless the session has been restarted since"""
+        if self.active_analyses.get(session_id) is task:
+            del self.active_analyses[session_id]
+        
     async def cancel_analysis(self, session_id: str) -> bool:
         """Cancel running analysis"""
-        if session_id in self.active_analyses:
-            self.active_analyses[session_id].set()
+        task = self.active_analyses.get(session_id)
+        if task is not None:
+            task.cancel()
             logger.info(f"Cancelled analysis for session {session_id}")
             return True
         return False
         
-    async def _run_analysis(self, session_id: str, request: AnalysisRequest, cancel_event: threading.Event):
-        """Run analysis in background thread"""
-        session_manager = await get_session_manager()
+    async def _run_analysis(self, session_id: str, request: AnalysisRequest):
+        """Stream the analysis graph and hand each chunk to the stream handler"""
+        session_manager = None
         stream_handler = AnalysisStreamHandler(session_id)
-        await stream_handler.initialize()
         
         try:
+            session_manager = await get_session_manager()
+            await stream_handler.initialize()
+            
             # Mark analysis as started
             await session_manager.start_analysis(session_id)
             
-            # Run analysis in thread pool
-            loop = asyncio.get_event_loop()
-            final_result = await loop.run_in_executor(
-                self.executor,
-                self._execute_analysis,
-                session_id,
-                request,
-                cancel_event,
-                stream_handler
+            # Building the graph is blocking, so it stays off the event loop
+            loop = asyncio.get_running_loop()
+            graph, init_agent_state = await loop.run_in_executor(
+                self.executor, self._build_graph, request
             )
             
-            if final_result and not cancel_event.is_set():
+            # LangGraph runs the (sync) nodes in worker threads; chunks arrive
+            # here without any cross-thread hand-off
+            final_result = None
+            async for chunk in graph.graph.astream(init_agent_state, config={"recursion_limit": 50}):
+                await stream_handler.handle_chunk(chunk)
+                final_result = chunk
+                
+            if final_result:
                 # Analysis completed successfully
                 final_decision = final_result.get("final_trade_decision")
                 await session_manager.complete_analysis(session_id, final_decision)
@@ -320,74 +385,46 @@ class AnalysisService:
                 )
                 
                 websocket_manager = await get_websocket_manager()
-                await websocket_manager.broadcast_to_session(session_id, ws_message.dict())
+                await websocket_manager.broadcast_to_session(session_id, ws_message)
                 
-            elif cancel_event.is_set():
-                # Analysis was cancelled
-                await session_manager.cancel_analysis(session_id)
             else:
                 # Analysis failed
                 await session_manager.fail_analysis(session_id, "Analysis execution failed")
                 
+        except asyncio.CancelledError:
+            # Analysis was cancelled
+            logger.info(f"Analysis cancelled for session {session_id}")
+            if session_manager is not None:
+                await session_manager.cancel_analysis(session_id)
+            raise
+            
         except Exception as e:
             logger.error(f"Analysis error for session {session_id}: {e}")
-            await session_manager.fail_analysis(session_id, str(e))
-            await stream_handler._broadcast_error("analysis_execution_error", str(e))
-            
-        finally:
-            # Clean up
-            async with self.analysis_lock:
-                if session_id in self.active_analyses:
-                    del self.active_analyses[session_id]
+            if session_manager is not None:
+                await session_manager.fail_analysis(session_id, str(e))
+            if stream_handler.websocket_manager is not None:
+                await stream_handler._broadcast_error("analysis_execution_error", str(e))
                     
-    def _execute_analysis(self, session_id: str, request: AnalysisRequest, 
-                         cancel_event: threading.Event, stream_handler: AnalysisStreamHandler) -> Optional[Dict[str, Any]]:
-        """Execute analysis in thread (blocking)"""
-        try:
-            # Create configuration
-            config = DEFAULT_CONFIG.copy()
-            config["max_debate_rounds"] = request.research_depth
-            
-            # Map LLM config
-            llm_config = {
-                "provider": request.llm_config.provider.value,
-                "model": request.llm_config.model,
-                "temperature": request.llm_config.temperature
-            }
-            
-            # Create TradingAgentsGraph
-            selected_analysts = [analyst.value for analyst in request.selected_analysts]
-            graph = TradingAgentsGraph(
-                selected_analysts=selected_analysts,
-                debug=False,
-                config=config
-            )
-            
-            # Create initial state
-            init_agent_state = graph.propagator.create_initial_state(
-                request.ticker, request.trade_date
-            )
-            
-            # Stream analysis
-            final_state = None
-            for chunk in graph.graph.stream(init_agent_state, config={"recursion_limit": 50}):
-                if cancel_event.is_set():
-                    logger.info(f"Analysis cancelled for session {session_id}")
-                    return None
-                    
-                # Process chunk asynchronously
-                asyncio.run_coroutine_threadsafe(
-                    stream_handler.handle_chunk(chunk),
-                    asyncio.get_event_loop()
-                ).result()
-                
-                final_state = chunk
-                
-            return final_state
-            
-        except Exception as e:
-            logger.error(f"Analysis execution error: {e}")
-            raise
+    @staticmethod
+    def _build_graph(request: AnalysisRequest) -> Tuple[TradingAgentsGraph, Dict[str, Any]]:
+        """Create the graph and its initial state (blocking)"""
+        # Create configuration
+        config = DEFAULT_CONFIG.copy()
+        config["max_debate_rounds"] = request.research_depth
+        
+        # Create TradingAgentsGraph
+        selected_analysts = list(request.selected_analysts)
+        graph = TradingAgentsGraph(
+            selected_analysts=selected_analysts,
+            debug=False,
+            config=config
+        )
+        
+        # Create initial state
+        init_agent_state = graph.propagator.create_initial_state(
+            request.ticker, request.trade_date.isoformat()
+        )
+        return graph, init_agent_state
 
 # Global analysis service instance
 analysis_service = AnalysisService()
@@ -5,36 +5,53 @@ Manages analysis sessions, state tracking, and session lifecycle
 """
 
 import asyncio
+import time
 import uuid
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Any, List, Tuple
 from enum import Enum
 
 from ..models.analysis import (
-    AnalysisRequest, AnalysisSession, AnalysisStatus, AgentStatus
+    AnalysisRequest, AnalysisSession, AnalysisStatus, AgentStatus, utcnow
 )
 logger = logging.getLogger(__name__)
 
+# Number of locks serializing session updates (power of two)
+LOCK_STRIPES = 64
+
 class SessionState:
     """Individual session state management"""
     
-    def __init__(self, session_id: str, request: AnalysisRequest):
+    __slots__ = (
+        "session_id", "request", "_status_counts", "_status", "progress",
+        "agent_statuses", "current_agent", "reports", "created_at",
+        "started_at", "completed_at", "error_message", "last_activity"
+    )
+    
+    def __init__(self, session_id: str, request: AnalysisRequest,
+                 status_counts: Optional[Counter] = None):
         self.session_id = session_id
         self.request = request
-        self.status = AnalysisStatus.PENDING
+        # Per-status tally shared with the owning manager, kept current by
+        # the status setter so stats never scan the session table
+        self._status_counts = status_counts if status_counts is not None else Counter()
+        self._status = AnalysisStatus.PENDING
+        self._status_counts[self._status] += 1
         self.progress = 0.0
         self.agent_statuses: Dict[str, AgentStatus] = {}
+        self.current_agent: Optional[str] = None
         self.reports: Dict[str, Optional[str]] = {}
-        self.created_at = datetime.now()
+        self.created_at = utcnow()
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
         self.error_message: Optional[str] = None
-        self.last_activity = datetime.now()
+        self.last_activity = time.time()
         
         # Initialize agent statuses
         for analyst in request.selected_analysts:
-            self.agent_statuses[analyst.value] = AgentStatus.PENDING
+            self.agent_statuses[analyst] = AgentStatus.PENDING
             
         # Initialize report sections
         self.reports = {
@@ -47,10 +64,26 @@ class SessionState:
             "final_trade_decision": None
         }
         
+    @property
+    def status(self) -> AnalysisStatus:
+        return self._status
+        
+    @status.setter
+    def status(self, value: AnalysisStatus):
+        self._status_counts[self._status] -= 1
+        self._status_counts[value] += 1
+        self._status = value
+        
     def update_agent_status(self, agent: str, status: AgentStatus, error_message: Optional[str] = None):
         """Update agent status"""
         self.agent_statuses[agent] = status
-        self.last_activity = datetime.now()
+        self.last_activity = time.time()
+        
+        # Track the running agent so status reads don't scan agent_statuses
+        if status is AgentStatus.IN_PROGRESS:
+            self.current_agent = agent
+        elif self.current_agent == agent:
+            self.current_agent = None
         
         if status == AgentStatus.FAILED and error_message:
             self.error_message = f"Agent {agent} failed: {error_message}"
@@ -61,20 +94,20 @@ class SessionState:
     def update_report_section(self, section: str, content: str):
         """Update report section"""
         self.reports[section] = content
-        self.last_activity = datetime.now()
+        self.last_activity = time.time()
         
     def start_analysis(self):
         """Mark analysis as started"""
         self.status = AnalysisStatus.RUNNING
-        self.started_at = datetime.now()
-        self.last_activity = datetime.now()
+        self.started_at = utcnow()
+        self.last_activity = time.time()
         
     def complete_analysis(self, final_decision: Optional[str] = None):
         """Mark analysis as completed"""
         self.status = AnalysisStatus.COMPLETED
-        self.completed_at = datetime.now()
+        self.completed_at = utcnow()
         self.progress = 100.0
-        self.last_activity = datetime.now()
+        self.last_activity = time.time()
         
         if final_decision:
             self.reports["final_trade_decision"] = final_decision
@@ -83,14 +116,14 @@ class SessionState:
         """Mark analysis as failed"""
         self.status = AnalysisStatus.FAILED
         self.error_message = error_message
-        self.completed_at = datetime.now()
-        self.last_activity = datetime.now()
+        self.completed_at = utcnow()
+        self.last_activity = time.time()
         
     def cancel_analysis(self):
         """Mark analysis as cancelled"""
         self.status = AnalysisStatus.CANCELLED
-        self.completed_at = datetime.now()
-        self.last_activity = datetime.now()
+        self.completed_at = utcnow()
+        self.last_activity = time.time()
         
     def _calculate_progress(self):
         """Calculate overall progress based on agent statuses"""
@@ -98,21 +131,25 @@ class SessionState:
             self.progress = 0.0
             return
             
+        # Single pass over the table for progress and the overall outcome
         total_agents = len(self.agent_statuses)
-        completed_agents = sum(1 for status in self.agent_statuses.values() 
-                             if status in [AgentStatus.COMPLETED, AgentStatus.FAILED])
+        completed_agents = 0
+        failed_agents = []
+        for agent, status in self.agent_statuses.items():
+            if status is AgentStatus.COMPLETED:
+                completed_agents += 1
+            elif status is AgentStatus.FAILED:
+                failed_agents.append(agent)
         
-        self.progress = (completed_agents / total_agents) * 100.0
+        self.progress = ((completed_agents + len(failed_agents)) / total_agents) * 100.0
         
         # Update overall status based on agent statuses
-        if all(status == AgentStatus.COMPLETED for status in self.agent_statuses.values()):
-            if self.status == AnalysisStatus.RUNNING:
-                self.complete_analysis()
-        elif any(status == AgentStatus.FAILED for status in self.agent_statuses.values()):
-            if self.status == AnalysisStatus.RUNNING:
-                failed_agents = [agent for agent, status in self.agent_statuses.items() 
-                               if status == AgentStatus.FAILED]
-                self.fail_analysis(f"Agents failed: {', '.join(failed_agents)}")
+        if self.status is not AnalysisStatus.RUNNING:
+            return
+        if completed_agents == total_agents:
+            self.complete_analysis()
+        elif failed_agents:
+            self.fail_analysis(f"Agents failed: {', '.join(failed_agents)}")
                 
     def to_session_model(self) -> AnalysisSession:
         """Convert to AnalysisSession model"""
@@ -122,6 +159,7 @@ class SessionState:
             status=self.status,
             progress=self.progress,
             agent_statuses=self.agent_statuses,
+            current_agent=self.current_agent,
             reports=self.reports,
             created_at=self.created_at,
             started_at=self.started_at,
@@ -131,19 +169,21 @@ class SessionState:
         
     def is_expired(self, timeout_minutes: int = 60) -> bool:
         """Check if session is expired"""
-        cutoff_time = datetime.now() - timedelta(minutes=timeout_minutes)
-        return self.last_activity < cutoff_time
+        return time.time() - self.last_activity > timeout_minutes * 60
 
 class SessionManager:
     """Manages multiple analysis sessions"""
     
     def __init__(self, max_sessions: int = 100, session_timeout: int = 60):
         self.sessions: Dict[str, SessionState] = {}
-        self.session_locks: Dict[str, asyncio.Lock] = {}
+        # Fixed pool of locks shared by hash of session id, instead of one
+        # lock allocated (and later freed) per session
+        self._lock_stripes = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
         self.max_sessions = max_sessions
         self.session_timeout = session_timeout
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
+        self._status_counts: Counter = Counter()
         
         logger.info(f"Session Manager initialized (max_sessions={max_sessions}, timeout={session_timeout}min)")
         
@@ -176,20 +216,23 @@ class SessionManager:
             
             # If still at limit, remove oldest session
             if len(self.sessions) >= self.max_sessions:
-                oldest_session_id = min(self.sessions.keys(), 
-                                      key=lambda sid: self.sessions[sid].created_at)
+                # Sessions are only ever inserted here, so dict order is creation order
+                oldest_session_id = next(iter(self.sessions))
                 self.remove_session(oldest_session_id)
                 logger.warning(f"Removed oldest session {oldest_session_id} due to limit")
                 
         session_id = str(uuid.uuid4())
-        session_state = SessionState(session_id, request)
+        session_state = SessionState(session_id, request, self._status_counts)
         
         self.sessions[session_id] = session_state
-        self.session_locks[session_id] = asyncio.Lock()
         
         logger.info(f"Created session {session_id} for {request.ticker}")
         return session_id
         
+    def _lock_for(self, session_id: str) -> asyncio.Lock:
+        """Lock guarding updates to a session"""
+        return self._lock_stripes[hash(session_id) & (LOCK_STRIPES - 1)]
+        
     def get_session(self, session_id: str) -> Optional[SessionState]:
         """Get session by ID"""
         return self.sessions.get(session_id)
@@ -197,38 +240,67 @@ class SessionManager:
     async def update_agent_status(self, session_id: str, agent: str, status: AgentStatus, 
                                 error_message: Optional[str] = None) -> bool:
         """Update agent status in session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for agent status update")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.update_agent_status(agent, status, error_message)
             
         logger.debug(f"Updated agent {agent} status to {status} in session {session_id}")
         return True
         
+    async def update_agent_statuses(self, session_id: str,
+                                    updates: List[Tuple[str, AgentStatus]]) -> bool:
+        """Apply several agent status updates under one lock acquisition"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            logger.warning(f"Session {session_id} not found for agent status update")
+            return False
+            
+        async with self._lock_for(session_id):
+            for agent, status in updates:
+                session.update_agent_status(agent, status)
+                
+        logger.debug(f"Updated {len(updates)} agent statuses in session {session_id}")
+        return True
+        
     async def update_report_section(self, session_id: str, section: str, content: str) -> bool:
         """Update report section in session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for report update")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.update_report_section(section, content)
             
         logger.debug(f"Updated report section {section} in session {session_id}")
         return True
         
+    async def update_report_sections(self, session_id: str, sections: Dict[str, str]) -> bool:
+        """Update several report sections under one lock acquisition"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            logger.warning(f"Session {session_id} not found for report update")
+            return False
+            
+        async with self._lock_for(session_id):
+            for section, content in sections.items():
+                session.update_report_section(section, content)
+                
+        logger.debug(f"Updated report sections {', '.join(sections)} in session {session_id}")
+        return True
+        
     async def start_analysis(self, session_id: str) -> bool:
         """Start analysis for session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for analysis start")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.start_analysis()
             
         logger.info(f"Started analysis for session {session_id}")
@@ -236,12 +308,12 @@ class SessionManager:
         
     async def complete_analysis(self, session_id: str, final_decision: Optional[str] = None) -> bool:
         """Complete analysis for session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for analysis completion")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.complete_analysis(final_decision)
             
         logger.info(f"Completed analysis for session {session_id}")
@@ -249,12 +321,12 @@ class SessionManager:
         
     async def fail_analysis(self, session_id: str, error_message: str) -> bool:
         """Fail analysis for session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for analysis failure")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.fail_analysis(error_message)
             
         logger.error(f"Failed analysis for session {session_id}: {error_message}")
@@ -262,12 +334,12 @@ class SessionManager:
         
     async def cancel_analysis(self, session_id: str) -> bool:
         """Cancel analysis for session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Session {session_id} not found for analysis cancellation")
             return False
             
-        async with self.session_locks[session_id]:
-            session = self.sessions[session_id]
+        async with self._lock_for(session_id):
             session.cancel_analysis()
             
         logger.info(f"Cancelled analysis for session {session_id}")
@@ -276,9 +348,8 @@ class SessionManager:
     def remove_session(self, session_id: str) -> bool:
         """Remove session"""
         if session_id in self.sessions:
-            del self.sessions[session_id]
-            if session_id in self.session_locks:
-                del self.session_locks[session_id]
+            session = self.sessions.pop(session_id)
+            self._status_counts[session.status] -= 1
             logger.info(f"Removed session {session_id}")
             return True
         return False
@@ -298,18 +369,9 @@ class SessionManager:
         
     def get_session_stats(self) -> Dict[str, int]:
         """Get session statistics"""
-        stats = {
-            "total": len(self.sessions),
-            "pending": 0,
-            "running": 0,
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0
-        }
-        
-        for session in self.sessions.values():
-            stats[session.status.value] += 1
-            
+        stats = {"total": len(self.sessions)}
+        for status in AnalysisStatus:
+            stats[status.value] = self._status_counts[status]
         return stats
         
     def _cleanup_expired_sessions(self) -> int:
@@ -7,65 +7,177 @@ Thread-safe WebSocket connection management with session tracking and message br
 import asyncio
 import json
 import logging
+import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Set, Any, Optional, List
-from collections import defaultdict
+import orjson
+from datetime import timedelta
+from typing import Dict, Any, Optional, List, Tuple, Union
+from collections import deque
 from fastapi import WebSocket, WebSocketDisconnect
-from ..utils.performance import message_batcher, memory_manager, performance_monitor
+from pydantic import BaseModel
+from ..utils.performance import memory_manager, performance_monitor
 from ..utils.security import rate_limiter, get_client_id
 from ..models.websocket import (
     WebSocketMessage, AgentStatusUpdateMessage, MessageUpdateMessage, ToolCallMessage,
-    ReportUpdateMessage, AnalysisCompleteMessage, AnalysisErrorMessage, HeartbeatMessage
+    ReportUpdateMessage, AnalysisCompleteMessage, AnalysisErrorMessage, HeartbeatMessage,
+    WebSocketError, encode_message
 )
+from ..models.analysis import utcnow
 logger = logging.getLogger(__name__)
 
+# Outgoing messages are coalesced per connection and sent as one JSON array
+# per frame; the flush delay bounds added latency, the cap bounds frame size.
+# A slow client can queue at most MAX_OUTBOX_SIZE messages; beyond that new
+# messages are dropped and the client is told how many in the next frame.
+FLUSH_INTERVAL = 0.005
+MAX_BATCH_SIZE = 128
+MAX_OUTBOX_SIZE = 1024
+
+# Outgoing messages are plain dicts or message models
+OutboundMessage = Union[Dict[str, Any], BaseModel]
+
+def _outbound(message: OutboundMessage) -> Any:
+    """Encode models once with their own serializer; orjson embeds the bytes as-is"""
+    if isinstance(message, BaseModel):
+        return orjson.Fragment(encode_message(message))
+    return message
+
 class WebSocketConnection:
     """Individual WebSocket connection wrapper"""
     
+    __slots__ = (
+        "websocket", "session_id", "connection_id", "connected_at",
+        "last_heartbeat", "is_alive", "outbox", "dropped", "_outbox_ready",
+        "_flusher"
+    )
+    
     def __init__(self, websocket: WebSocket, session_id: str, connection_id: str):
         self.websocket = websocket
         self.session_id = session_id
         self.connection_id = connection_id
-        self.connected_at = datetime.now()
-        self.last_heartbeat = datetime.now()
+        self.connected_at = utcnow()
+        self.last_heartbeat = time.monotonic()
         self.is_alive = True
         
-    async def send_message(self, message: Dict[str, Any]) -> bool:
-        """Send message to WebSocket connection"""
+        # Outgoing message queue drained by the flusher task
+        self.outbox: deque = deque()
+        self.dropped = 0
+        self._outbox_ready = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        
+    def start(self):
+        """Start the background flusher for this connection"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+            
+    async def close(self):
+        """Stop the flusher; queued messages are dropped"""
+        self.is_alive = False
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        self.outbox.clear()
+        
+    async def send_message(self, message: OutboundMessage) -> bool:
+        """Queue message for the next batched frame"""
+        if not self.is_alive:
+            return False
+        if len(self.outbox) >= MAX_OUTBOX_SIZE:
+            if not self.dropped:
+                logger.warning(f"Outbox full for {self.connection_id}, dropping messages")
+            self.dropped += 1
+            return False
+        self.outbox.append(_outbound(message))
+        self._outbox_ready.set()
+        return True
+        
+    async def send_messages(self, messages: List[Any]) -> int:
+        """Queue already-encoded messages for the next frame; returns how many fit"""
+        if not self.is_alive:
+            return 0
+        room = MAX_OUTBOX_SIZE - len(self.outbox)
+        if room < len(messages):
+            if not self.dropped:
+                logger.warning(f"Outbox full for {self.connection_id}, dropping messages")
+            self.dropped += len(messages) - max(room, 0)
+            messages = messages[:max(room, 0)]
+        if messages:
+            self.outbox.extend(messages)
+            self._outbox_ready.set()
+        return len(messages)
+        
+    async def _flush_loop(self):
+        """Send queued messages as JSON arrays, one frame per batch"""
         try:
-            await self.websocket.send_text(json.dumps(message, default=str))
-            return True
+            while self.is_alive:
+                await self._outbox_ready.wait()
+                # Give closely spaced messages a moment to pile up
+                await asyncio.sleep(FLUSH_INTERVAL)
+                while self.outbox:
+                    count = min(len(self.outbox), MAX_BATCH_SIZE)
+                    batch = [self.outbox.popleft() for _ in range(count)]
+                    # One clock reading for every unstamped payload in the frame.
+                    # Payloads are shared with other connections and the
+                    # message history, so stamp a copy rather than in place
+                    timestamp = utcnow()
+                    batch = [
+                        {**message, "timestamp": timestamp}
+                        if type(message) is dict and "timestamp" not in message
+                        else message
+                        for message in batch
+                    ]
+                    if self.dropped:
+                        batch.append(self._dropped_notice())
+                        self.dropped = 0
+                    await self.websocket.send_text(
+                        orjson.dumps(batch, default=str).decode()
+                    )
+                self._outbox_ready.clear()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.warning(f"Failed to send message to {self.connection_id}: {e}")
             self.is_alive = False
-            return False
             
+    def _dropped_notice(self) -> Dict[str, Any]:
+        """Error message telling the client that updates were dropped"""
+        error_message = f"{self.dropped} messages dropped because the connection fell behind"
+        notice = WebSocketError(
+            error_code="messages_dropped",
+            error_message=error_message,
+            session_id=self.session_id
+        ).model_dump()
+        # The frontend reads error frames from data.error
+        notice["data"] = {"error": error_message}
+        return notice
+        
     async def send_heartbeat(self) -> bool:
         """Send heartbeat message"""
         heartbeat = HeartbeatMessage(session_id=self.session_id)
-        return await self.send_message(heartbeat.dict())
+        return await self.send_message(heartbeat)
         
     def update_heartbeat(self):
         """Update last heartbeat timestamp"""
-        self.last_heartbeat = datetime.now()
+        self.last_heartbeat = time.monotonic()
 
 class SessionManager:
     """Manages analysis sessions and their state"""
     
     def __init__(self):
         self.sessions: Dict[str, Dict[str, Any]] = {}
-        self.session_locks: Dict[str, asyncio.Lock] = {}
         
     def create_session(self, session_id: str, initial_data: Dict[str, Any]) -> None:
         """Create a new session"""
         self.sessions[session_id] = {
-            "created_at": datetime.now(),
+            "created_at": utcnow(),
             "status": "pending",
             "data": initial_data,
-            "last_activity": datetime.now()
+            "last_activity": utcnow()
         }
-        self.session_locks[session_id] = asyncio.Lock()
         logger.info(f"Created session {session_id}")
         
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -76,19 +188,17 @@ class SessionManager:
         """Update session data"""
         if session_id in self.sessions:
             self.sessions[session_id]["data"].update(updates)
-            self.sessions[session_id]["last_activity"] = datetime.now()
+            self.sessions[session_id]["last_activity"] = utcnow()
             
     def remove_session(self, session_id: str) -> None:
         """Remove session"""
         if session_id in self.sessions:
             del self.sessions[session_id]
-            if session_id in self.session_locks:
-                del self.session_locks[session_id]
             logger.info(f"Removed session {session_id}")
             
     def cleanup_expired_sessions(self, timeout_minutes: int = 60) -> None:
         """Clean up expired sessions"""
-        cutoff_time = datetime.now() - timedelta(minutes=timeout_minutes)
+        cutoff_time = utcnow() - timedelta(minutes=timeout_minutes)
         expired_sessions = [
             session_id for session_id, session_data in self.sessions.items()
             if session_data["last_activity"] < cutoff_time
@@ -104,7 +214,9 @@ class WebSocketManager:
     def __init__(self, heartbeat_interval: int = 30, session_timeout: int = 60):
         # Connection management
         self.connections: Dict[str, WebSocketConnection] = {}
-        self.session_connections: Dict[str, Set[str]] = defaultdict(set)
+        # Session ID -> immutable tuple of its connections, replaced copy-on-write
+        # on connect/disconnect so broadcasts iterate it without copying
+        self.session_connections: Dict[str, Tuple[WebSocketConnection, ...]] = {}
         self.connection_lock = asyncio.Lock()
         
         # Session management
@@ -150,6 +262,7 @@ class WebSocketManager:
         # Close all connections
         async with self.connection_lock:
             for connection in self.connections.values():
+                await connection.close()
                 try:
                     await connection.websocket.close()
                 except Exception:
@@ -165,10 +278,11 @@ class WebSocketManager:
         
         connection_id = str(uuid.uuid4())
         connection = WebSocketConnection(websocket, session_id, connection_id)
+        connection.start()
         
         async with self.connection_lock:
             self.connections[connection_id] = connection
-            self.session_connections[session_id].add(connection_id)
+            self.session_connections[session_id] = self.session_connections.get(session_id, ()) + (connection,)
             
         # Send connection acknowledgment
         ack_message = {
@@ -176,7 +290,7 @@ class WebSocketManager:
             "session_id": session_id,
             "connection_id": connection_id,
             "message": f"WebSocket connection established for session {session_id}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": utcnow().isoformat()
         }
         await connection.send_message(ack_message)
         
@@ -195,91 +309,115 @@ class WebSocketManager:
                 
                 # Remove from connections
                 del self.connections[connection_id]
+                await connection.close()
                 
                 # Remove from session connections
-                if session_id in self.session_connections:
-                    self.session_connections[session_id].discard(connection_id)
-                    if not self.session_connections[session_id]:
-                        del self.session_connections[session_id]
+                remaining = tuple(
+                    conn for conn in self.session_connections.get(session_id, ())
+                    if conn is not connection
+                )
+                if remaining:
+                    self.session_connections[session_id] = remaining
+                else:
+                    self.session_connections.pop(session_id, None)
                         
                 logger.info(f"WebSocket disconnected: {connection_id} from session {session_id}")
                 
                 # Record performance metrics
                 performance_monitor.record_websocket_connection(False)
                 
-    async def broadcast_to_session(self, session_id: str, message: Dict[str, Any]) -> int:
+    async def broadcast_to_session(self, session_id: str, message: OutboundMessage) -> int:
         """Broadcast message to all connections in a session with performance optimizations"""
-        if session_id not in self.session_connections:
+        connections = self.session_connections.get(session_id)
+        if not connections:
             logger.warning(f"No connections found for session {session_id}")
             return 0
             
-        # Store message in memory manager
+        # Encode once for every connection, then store in memory manager
+        message = _outbound(message)
         memory_manager.add_message(session_id, message)
         
-        # Use message batcher for efficient transmission
-        connection_ids = list(self.session_connections[session_id])
+        # Each connection coalesces its own outgoing frames
         successful_sends = 0
         failed_connections = []
         
-        async def send_callback(msg):
-            nonlocal successful_sends, failed_connections
-            for connection_id in connection_ids:
-                if connection_id in self.connections:
-                    connection = self.connections[connection_id]
-                    success = await connection.send_message(msg)
-                    if success:
-                        successful_sends += 1
-                        performance_monitor.record_message_sent()
-                    else:
-                        failed_connections.append(connection_id)
-        
-        # Use message batcher for performance
-        await message_batcher.add_message(session_id, message, send_callback)
-        
+        for connection in connections:
+            if await connection.send_message(message):
+                successful_sends += 1
+                performance_monitor.record_message_sent()
+            elif not connection.is_alive:
+                # A full outbox only drops the message; dead sockets are removed
+                failed_connections.append(connection.connection_id)
+                
         # Clean up failed connections
-        if failed_connections:
-            async with self.connection_lock:
-                for connection_id in failed_connections:
-                    await self.disconnect(connection_id)
+        for connection_id in failed_connections:
+            await self.disconnect(connection_id)
                     
         return successful_sends
         
-    async def broadcast_to_all(self, message: Dict[str, Any]) -> int:
+    async def broadcast_batch_to_session(self, session_id: str, messages: List[OutboundMessage]) -> int:
+        """Broadcast several messages to a session, visiting each connection once"""
+        if not messages:
+            return 0
+        connections = self.session_connections.get(session_id)
+        if not connections:
+            logger.warning(f"No connections found for session {session_id}")
+            return 0
+            
+        messages = [_outbound(message) for message in messages]
+        memory_manager.add_messages(session_id, messages)
+        
+        successful_sends = 0
+        failed_connections = []
+        
+        for connection in connections:
+            sent = await connection.send_messages(messages)
+            if sent:
+                successful_sends += sent
+                performance_monitor.record_messages_sent(sent)
+            elif not connection.is_alive:
+                failed_connections.append(connection.connection_id)
+                
+        for connection_id in failed_connections:
+            await self.disconnect(connection_id)
+            
+        return successful_sends
+        
+    async def broadcast_to_all(self, message: OutboundMessage) -> int:
         """Broadcast message to all active connections"""
-        connection_ids = list(self.connections.keys())
+        message = _outbound(message)
         successful_sends = 0
         failed_connections = []
         
-        for connection_id in connection_ids:
-            if connection_id in self.connections:
-                connection = self.connections[connection_id]
-                success = await connection.send_message(message)
-                if success:
-                    successful_sends += 1
-                else:
-                    failed_connections.append(connection_id)
+        for connection in list(self.connections.values()):
+            if await connection.send_message(message):
+                successful_sends += 1
+            elif not connection.is_alive:
+                failed_connections.append(connection.connection_id)
                     
         # Clean up failed connections
-        if failed_connections:
-            async with self.connection_lock:
-                for connection_id in failed_connections:
-                    await self.disconnect(connection_id)
+        for connection_id in failed_connections:
+            await self.disconnect(connection_id)
                     
         return successful_sends
         
-    async def send_to_connection(self, connection_id: str, message: Dict[str, Any]) -> bool:
+    async def send_to_connection(self, connection_id: str, message: OutboundMessage) -> bool:
         """Send message to specific connection"""
         if connection_id in self.connections:
             connection = self.connections[connection_id]
             success = await connection.send_message(message)
-            if not success:
+            if not success and not connection.is_alive:
                 await self.disconnect(connection_id)
             return success
         return False
         
     def get_session_connection_count(self, session_id: str) -> int:
         """Get number of active connections for a session"""
-        return len(self.session_connections.get(session_id, set()))
+        return len(self.session_connections.get(session_id, ()))
+        
+    def has_session_connections(self, session_id: str) -> bool:
+        """Whether any client is connected to a session"""
+        return session_id in self.session_connections
         
     def get_total_connection_count(self) -> int:
         """Get total number of active connections"""
@@ -335,7 +473,7 @@ class WebSocketManager:
                 self.connections[connection_id].update_heartbeat()
         elif message_type == "ping":
             # Client ping, send pong
-            pong_message = {"type": "pong", "timestamp": datetime.now().isoformat()}
+            pong_message = {"type": "pong", "timestamp": utcnow().isoformat()}
             await self.send_to_connection(connection_id, pong_message)
         else:
             logger.debug(f"Unhandled client message type: {message_type}")
@@ -346,14 +484,15 @@ class WebSocketManager:
             try:
                 await asyncio.sleep(self.heartbeat_interval)
                 
-                current_time = datetime.now()
+                current_time = time.monotonic()
                 dead_connections = []
                 
                 # Check all connections
-                for connection_id, connection in self.connections.items():
+                for connection_id, connection in list(self.connections.items()):
                     time_since_heartbeat = current_time - connection.last_heartbeat
                     
-                    if time_since_heartbeat.total_seconds() > self.heartbeat_interval * 2:
+                    if (not connection.is_alive or
+                            time_since_heartbeat > self.heartbeat_interval * 2):
                         # Connection is dead
                         dead_connections.append(connection_id)
                     else:
@@ -7,6 +7,7 @@ import time
 import logging
 from typing import Dict, List, Any, Optional
 from collections import deque
+from itertools import repeat
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 
@@ -125,6 +126,17 @@ class MemoryManager:
         if len(self.session_messages) > self.max_sessions:
             self._cleanup_old_sessions()
             
+    def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Add a batch of messages to session history in one step"""
+        if session_id not in self.session_messages:
+            self.session_messages[session_id] = deque(maxlen=self.max_messages_per_session)
+            
+        self.session_messages[session_id].extend(messages)
+        self.session_last_activity[session_id] = time.time()
+        
+        if len(self.session_messages) > self.max_sessions:
+            self._cleanup_old_sessions()
+            
     def get_session_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get messages for session with optional limit"""
         if session_id not in self.session_messages:
@@ -170,6 +182,7 @@ class PerformanceMonitor:
             'messages_sent': deque(maxlen=window_size),
             'response_times': deque(maxlen=window_size),
             'error_count': deque(maxlen=window_size),
+            'rate_limiter_errors': 0,
         }
         
     def record_websocket_connection(self, connected: bool) -> None:
@@ -190,6 +203,10 @@ class PerformanceMonitor:
         """Record message sent"""
         self.metrics['messages_sent'].append(timestamp or time.time())
         
+    def record_messages_sent(self, count: int) -> None:
+        """Record several messages sent at the same moment"""
+        self.metrics['messages_sent'].extend(repeat(time.time(), count))
+        
     def record_response_time(self, response_time: float) -> None:
         """Record API response time"""
         self.metrics['response_times'].append(response_time)
@@ -198,6 +215,10 @@ class PerformanceMonitor:
         """Record error occurrence"""
         self.metrics['error_count'].append(timestamp or time.time())
         
+    def record_rate_limiter_error(self) -> None:
+        """Record a rate limiter backend failure (request was let through or fell back)"""
+        self.metrics['rate_limiter_errors'] += 1
+        
     def get_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
         current_time = time.time()
@@ -220,6 +241,7 @@ class PerformanceMonitor:
             'average_response_time_ms': avg_response_time * 1000,
             'total_messages_in_window': len(self.metrics['messages_sent']),
             'total_errors_in_window': len(self.metrics['error_count']),
+            'rate_limiter_errors_total': self.metrics['rate_limiter_errors'],
         }
         
     def _calculate_rate(self, timestamps: deque, current_time: float) -> float:
@@ -0,0 +1,13 @@
+"""
+Response helpers for TradingAgents Web Backend
+"""
+
+from fastapi import Response
+
+def json_response(body: bytes) -> Response:
+    """Wrap pre-encoded JSON bytes in a response
+
+    Routes that return this keep their response_model for the OpenAPI schema
+    only: FastAPI neither validates nor re-serializes a returned Response.
+    """
+    return Response(body, media_type="application/json")
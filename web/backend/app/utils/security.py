@@ -2,17 +2,30 @@
 Security utilities for TradingAgents Web Backend
 """
 
+import os
 import time
 import hashlib
 import secrets
 import logging
 from typing import Dict, Set, Optional, Any
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass
 from fastapi import HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import re
 
+from .performance import performance_monitor
+from ..models.analysis import TICKER_RE, TICKER_MAX_LENGTH
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # redis is optional; without it the in-memory limiter is used
+    aioredis = None
+
+    class RedisError(Exception):
+        """Placeholder so callers can catch RedisError without redis installed"""
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -22,77 +35,197 @@ class RateLimitRule:
     window_seconds: int
     burst_allowance: int = 0
 
+DEFAULT_RATE_LIMIT_RULES: Dict[str, RateLimitRule] = {
+    'analysis': RateLimitRule(requests_per_window=5, window_seconds=60, burst_allowance=2),
+    'websocket': RateLimitRule(requests_per_window=100, window_seconds=60, burst_allowance=10),
+    'config': RateLimitRule(requests_per_window=20, window_seconds=60, burst_allowance=5),
+    'default': RateLimitRule(requests_per_window=30, window_seconds=60, burst_allowance=5)
+}
+
+class LogThrottle:
+    """Lets a log line through at most once per interval and counts the rest"""
+    
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self.suppressed = 0
+        self.dropped = 0
+        self._next_allowed = 0.0
+        
+    def allow(self) -> bool:
+        """True if the line should be logged; `dropped` then holds the skipped count"""
+        now = time.monotonic()
+        if now < self._next_allowed:
+            self.suppressed += 1
+            return False
+        self._next_allowed = now + self.interval
+        self.dropped, self.suppressed = self.suppressed, 0
+        return True
+
 class RateLimiter:
-    """Token bucket rate limiter with burst support"""
+    """Sliding-window rate limiter over fixed time buckets (in-memory, per process)
     
-    def __init__(self):
-        self.client_buckets: Dict[str, Dict[str, Any]] = {}
-        self.rules: Dict[str, RateLimitRule] = {
-            'analysis': RateLimitRule(requests_per_window=5, window_seconds=60, burst_allowance=2),
-            'websocket': RateLimitRule(requests_per_window=100, window_seconds=60, burst_allowance=10),
-            'config': RateLimitRule(requests_per_window=20, window_seconds=60, burst_allowance=5),
-            'default': RateLimitRule(requests_per_window=30, window_seconds=60, burst_allowance=5)
-        }
+    Each client/endpoint pair keeps window_seconds // bucket_seconds request
+    counters, so a check is constant work and memory per client is bounded.
+    A client may use requests_per_window per window; the burst allowance is
+    added only during its first window. Least recently seen clients are
+    evicted beyond max_clients.
+    """
+    
+    def __init__(self, rules: Optional[Dict[str, RateLimitRule]] = None,
+                 bucket_seconds: int = 10, max_clients: int = 100_000):
+        self.client_buckets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.rules: Dict[str, RateLimitRule] = dict(rules or DEFAULT_RATE_LIMIT_RULES)
+        self.bucket_seconds = bucket_seconds
+        self.max_clients = max_clients
         
-    def is_allowed(self, client_id: str, endpoint_type: str = 'default') -> bool:
+    async def is_allowed(self, client_id: str, endpoint_type: str = 'default') -> bool:
         """Check if request is allowed under rate limit"""
         rule = self.rules.get(endpoint_type, self.rules['default'])
-        current_time = time.time()
-        
-        # Initialize client bucket if new
-        if client_id not in self.client_buckets:
-            self.client_buckets[client_id] = {
-                'tokens': rule.requests_per_window + rule.burst_allowance,
-                'last_refill': current_time,
-                'requests': deque(maxlen=rule.requests_per_window * 2)
-            }
-            
-        bucket = self.client_buckets[client_id]
-        
-        # Refill tokens based on time elapsed
-        time_elapsed = current_time - bucket['last_refill']
-        tokens_to_add = (time_elapsed / rule.window_seconds) * rule.requests_per_window
-        bucket['tokens'] = min(
-            rule.requests_per_window + rule.burst_allowance,
-            bucket['tokens'] + tokens_to_add
-        )
-        bucket['last_refill'] = current_time
+        bucket = self._get_bucket(f"{endpoint_type}:{client_id}", rule)
         
         # Check if request is allowed
-        if bucket['tokens'] >= 1:
-            bucket['tokens'] -= 1
-            bucket['requests'].append(current_time)
+        if sum(bucket['counts']) < self._limit(bucket, rule):
+            bucket['counts'][-1] += 1
+            bucket['last_request'] = time.time()
             return True
             
         logger.warning(f"Rate limit exceeded for client {client_id} on {endpoint_type}")
         return False
         
-    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+    def _get_bucket(self, key: str, rule: RateLimitRule) -> Dict[str, Any]:
+        """Fetch (or create) a client's counters, rolled forward to now"""
+        index = int(time.monotonic() // self.bucket_seconds)
+        bucket = self.client_buckets.get(key)
+        
+        if bucket is None:
+            size = max(1, rule.window_seconds // self.bucket_seconds)
+            bucket = {
+                'counts': deque([0] * size, maxlen=size),
+                'index': index,
+                # Burst allowance applies until the first window has passed
+                'burst_until': index + size,
+                'last_request': None
+            }
+            self.client_buckets[key] = bucket
+            if len(self.client_buckets) > self.max_clients:
+                self.client_buckets.popitem(last=False)
+            return bucket
+            
+        self.client_buckets.move_to_end(key)
+        
+        # Drop counters that have slid out of the window
+        counts = bucket['counts']
+        elapsed = min(index - bucket['index'], counts.maxlen)
+        if elapsed > 0:
+            counts.extend([0] * elapsed)
+            bucket['index'] = index
+        return bucket
+        
+    @staticmethod
+    def _limit(bucket: Dict[str, Any], rule: RateLimitRule) -> int:
+        """Requests admitted in the client's current window"""
+        if bucket['index'] < bucket['burst_until']:
+            return rule.requests_per_window + rule.burst_allowance
+        return rule.requests_per_window
+        
+    def get_client_stats(self, client_id: str, endpoint_type: str = 'default') -> Dict[str, Any]:
         """Get rate limiting stats for client"""
-        if client_id not in self.client_buckets:
+        key = f"{endpoint_type}:{client_id}"
+        if key not in self.client_buckets:
             return {'tokens': 0, 'requests_in_window': 0}
             
-        bucket = self.client_buckets[client_id]
-        current_time = time.time()
-        
-        # Count recent requests
-        recent_requests = sum(
-            1 for req_time in bucket['requests'] 
-            if current_time - req_time <= 60
-        )
+        rule = self.rules.get(endpoint_type, self.rules['default'])
+        bucket = self._get_bucket(key, rule)
+        recent_requests = sum(bucket['counts'])
         
         return {
-            'tokens': int(bucket['tokens']),
+            'tokens': self._limit(bucket, rule) - recent_requests,
             'requests_in_window': recent_requests,
-            'last_request': bucket['last_refill']
+            'last_request': bucket['last_request']
         }
 
+# GCRA: one atomic round trip per check. The key holds the theoretical
+# arrival time (ms); a request is rejected if it would push that more than
+# the burst tolerance ahead of now.
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + tonumber(now_parts[2]) / 1000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+if new_tat - now > tolerance then
+    return 0
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return 1
+"""
+
+class RedisRateLimiter:
+    """GCRA rate limiter stored in Redis, shared by every worker process"""
+    
+    def __init__(self, redis_url: str, rules: Optional[Dict[str, RateLimitRule]] = None,
+                 key_prefix: str = "ratelimit"):
+        self.rules: Dict[str, RateLimitRule] = dict(rules or DEFAULT_RATE_LIMIT_RULES)
+        self.key_prefix = key_prefix
+        self.redis = aioredis.from_url(redis_url)
+        # register_script issues EVALSHA and reloads the script on NOSCRIPT
+        self._gcra = self.redis.register_script(GCRA_SCRIPT)
+        # Used while Redis is unreachable so requests are still limited
+        self.fallback = RateLimiter(self.rules)
+        self._error_log = LogThrottle()
+        
+    async def load_script(self) -> None:
+        """Preload the GCRA script so the first check is a plain EVALSHA"""
+        await self.redis.script_load(GCRA_SCRIPT)
+        
+    async def is_allowed(self, client_id: str, endpoint_type: str = 'default') -> bool:
+        """Check if request is allowed under rate limit"""
+        rule = self.rules.get(endpoint_type, self.rules['default'])
+        interval_ms = rule.window_seconds * 1000 / rule.requests_per_window
+        tolerance_ms = interval_ms * (rule.requests_per_window + rule.burst_allowance)
+        
+        try:
+            allowed = await self._gcra(
+                keys=[f"{self.key_prefix}:{endpoint_type}:{client_id}"],
+                args=[interval_ms, tolerance_ms]
+            )
+        except RedisError as e:
+            performance_monitor.record_rate_limiter_error()
+            if self._error_log.allow():
+                logger.warning(
+                    f"Redis rate limiter unavailable, using in-memory fallback: {e} "
+                    f"({self._error_log.dropped} similar warnings suppressed)"
+                )
+            return await self.fallback.is_allowed(client_id, endpoint_type)
+            
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for client {client_id} on {endpoint_type}")
+        return bool(allowed)
+        
+    async def close(self) -> None:
+        """Close the Redis connection pool"""
+        await self.redis.close()
+
+def create_rate_limiter():
+    """Use the Redis limiter when REDIS_URL is set, else the in-memory one"""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        if aioredis is not None:
+            return RedisRateLimiter(redis_url)
+        logger.warning("REDIS_URL is set but redis is not installed; using in-memory rate limiter")
+    return RateLimiter()
+
 class InputValidator:
     """Validates and sanitizes user inputs"""
     
     # Regex patterns for validation
     PATTERNS = {
-        'ticker': re.compile(r'^[A-Z]{1,5}$'),
+        # Same ticker format the request models enforce
+        'ticker': TICKER_RE,
         'session_id': re.compile(r'^[a-zA-Z0-9_-]{8,64}$'),
         'analyst_name': re.compile(r'^[a-zA-Z\s]{3,50}$'),
         'llm_provider': re.compile(r'^(openai|anthropic|groq)$'),
@@ -102,7 +235,7 @@ class InputValidator:
     
     # Maximum lengths for string fields
     MAX_LENGTHS = {
-        'ticker': 5,
+        'ticker': TICKER_MAX_LENGTH,
         'session_id': 64,
         'analyst_name': 50,
         'llm_provider': 20,
@@ -118,8 +251,10 @@ class InputValidator:
             raise ValueError("Ticker must be a non-empty string")
             
         ticker = ticker.upper().strip()
+        if len(ticker) > cls.MAX_LENGTHS['ticker']:
+            raise ValueError(f"Ticker must be at most {cls.MAX_LENGTHS['ticker']} characters")
         if not cls.PATTERNS['ticker'].match(ticker):
-            raise ValueError("Ticker must be 1-5 uppercase letters")
+            raise ValueError("Ticker must contain only letters, digits, '.', '-' or '^'")
             
         return ticker
         
@@ -308,30 +443,53 @@ class SessionManager:
         }
 
 # Global instances
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter()
 input_validator = InputValidator()
 session_manager = SessionManager()
 
-def get_client_id(request: Request) -> str:
-    """Extract client identifier from request"""
-    # Use X-Forwarded-For if behind proxy, otherwise use client IP
-    forwarded_for = request.headers.get('X-Forwarded-For')
+def get_client_id_from_scope(scope: Dict[str, Any]) -> str:
+    """Extract client identifier straight from the ASGI scope"""
+    forwarded_for = real_ip = None
+    user_agent = b''
+    for name, value in scope.get('headers', ()):
+        if name == b'x-forwarded-for':
+            forwarded_for = forwarded_for or value
+        elif name == b'x-real-ip':
+            real_ip = real_ip or value
+        elif name == b'user-agent':
+            user_agent = user_agent or value
+            
+    # Use X-Forwarded-For / X-Real-IP if behind proxy, otherwise use client IP
     if forwarded_for:
-        client_ip = forwarded_for.split(',')[0].strip()
+        client_ip = forwarded_for.split(b',')[0].strip().decode('latin-1')
+    elif real_ip:
+        client_ip = real_ip.strip().decode('latin-1')
     else:
-        client_ip = request.client.host if request.client else 'unknown'
+        client = scope.get('client')
+        client_ip = client[0] if client else 'unknown'
         
     # Create hash of IP + User-Agent for better client identification
-    user_agent = request.headers.get('User-Agent', '')
-    client_string = f"{client_ip}:{user_agent}"
+    client_string = f"{client_ip}:{user_agent.decode('latin-1')}"
     
     return hashlib.sha256(client_string.encode()).hexdigest()[:16]
 
+def get_client_id(request: Request) -> str:
+    """Extract client identifier from request"""
+    return get_client_id_from_scope(request.scope)
+
+def get_client_id_cached(scope: Dict[str, Any]) -> str:
+    """get_client_id computed once per request and kept on the ASGI scope"""
+    client_id = scope.get("_client_id")
+    if client_id is None:
+        client_id = get_client_id_from_scope(scope)
+        scope["_client_id"] = client_id
+    return client_id
+
 async def check_rate_limit(request: Request, endpoint_type: str = 'default') -> None:
     """Middleware to check rate limits"""
-    client_id = get_client_id(request)
+    client_id = get_client_id_cached(request.scope)
     
-    if not rate_limiter.is_allowed(client_id, endpoint_type):
+    if not await rate_limiter.is_allowed(client_id, endpoint_type):
         raise HTTPException(
             status_code=429,
             detail="Rate limit exceeded. Please try again later.",
@@ -0,0 +1,28 @@
+"""
+Tests for analysis request models
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.analysis import AnalysisRequest
+
+
+def make_request(ticker: str) -> AnalysisRequest:
+    return AnalysisRequest(
+        ticker=ticker,
+        trade_date="2024-01-02",
+        selected_analysts=["Market Analyst"],
+        llm_config={"provider": "openai", "model": "gpt-4"}
+    )
+
+
+@pytest.mark.parametrize("ticker", ["SPY", "brk.b", "BRK-B", "RELIANCE.NS", "TCS.BO", "^GSPC"])
+def test_ticker_accepts_supported_formats(ticker):
+    assert make_request(ticker).ticker == ticker.upper()
+
+
+@pytest.mark.parametrize("ticker", [".NS", "SP Y", "AAPL$", ""])
+def test_ticker_rejects_invalid_formats(ticker):
+    with pytest.raises(ValidationError):
+        make_request(ticker)
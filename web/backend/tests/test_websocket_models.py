@@ -0,0 +1,39 @@
+"""
+Round-trip tests for WebSocket messages built without validation
+"""
+
+import pytest
+
+from app.models.websocket import (
+    create_analysis_complete_message,
+    create_error_message,
+    create_tool_call_message,
+    decode_message,
+    encode_message,
+)
+
+
+@pytest.mark.parametrize("message", [
+    create_tool_call_message(
+        "session-1", "get_stock_price", {"ticker": "SPY", "days": 5},
+        agent="Market Analyst", call_id="call-1"
+    ),
+    create_tool_call_message("session-1", "get_news", {}),
+    create_analysis_complete_message(
+        "session-1", final_trade_decision="BUY", summary="Bullish",
+        duration=12.5, total_agents=4, successful_agents=4
+    ),
+    create_analysis_complete_message("session-1"),
+    create_error_message(
+        "session-1", "analysis_error", "Rate limited",
+        agent="News Analyst", recoverable=True
+    ),
+    create_error_message("session-1", "analysis_error", "Failed"),
+], ids=lambda message: message.type)
+def test_constructed_message_round_trips(message):
+    validated = type(message).model_validate(message.model_dump())
+    decoded = decode_message(encode_message(message))
+
+    assert type(decoded) is type(message)
+    assert decoded == validated
+    assert decoded == message
@@ -24,41 +24,45 @@ export const useWebSocket = (sessionId?: string) => {
 
   const handleMessage = useCallback((event: MessageEvent) => {
     try {
-      const message: WSMessage = JSON.parse(event.data);
+      // Server coalesces messages into a JSON array per frame
+      const payload = JSON.parse(event.data);
+      const messages: WSMessage[] = Array.isArray(payload) ? payload : [payload];
       
-      switch (message.type) {
-        case 'agent_status':
-          const agentStatusMsg = message as WSAgentStatusMessage;
-          updateAgentStatus(agentStatusMsg.data.agent_name, agentStatusMsg.data);
-          break;
+      for (const message of messages) {
+        switch (message.type) {
+          case 'agent_status':
+            const agentStatusMsg = message as WSAgentStatusMessage;
+            updateAgentStatus(agentStatusMsg.data.agent_name, agentStatusMsg.data);
+            break;
           
-        case 'message':
-          const analysisMsg = message as WSAnalysisMessage;
-          addMessage(analysisMsg.data);
-          break;
+          case 'message':
+            const analysisMsg = message as WSAnalysisMessage;
+            addMessage(analysisMsg.data);
+            break;
           
-        case 'tool_call':
-          const toolCallMsg = message as WSToolCallMessage;
-          addToolCall(toolCallMsg.data);
-          break;
+          case 'tool_call':
+            const toolCallMsg = message as WSToolCallMessage;
+            addToolCall(toolCallMsg.data);
+            break;
           
-        case 'report':
-          const reportMsg = message as WSReportMessage;
-          addReport(reportMsg.data);
-          break;
+          case 'report':
+            const reportMsg = message as WSReportMessage;
+            addReport(reportMsg.data);
+            break;
           
-        case 'error':
-          const errorMsg = message as WSErrorMessage;
-          setError(errorMsg.data.error);
-          console.error('WebSocket error:', errorMsg.data);
-          break;
+          case 'error':
+            const errorMsg = message as WSErrorMessage;
+            setError(errorMsg.data.error);
+            console.error('WebSocket error:', errorMsg.data);
+            break;
           
-        case 'heartbeat':
-          // Handle heartbeat - just acknowledge
-          break;
+          case 'heartbeat':
+            // Handle heartbeat - just acknowledge
+            break;
           
-        default:
-          console.warn('Unknown WebSocket message type:', message.type);
+          default:
+            console.warn('Unknown WebSocket message type:', message.type);
+        }
       }
     } catch (error) {
       console.error('Failed to parse WebSocket message:', error);
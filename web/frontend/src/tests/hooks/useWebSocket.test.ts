@@ -213,6 +213,35 @@ describe('useWebSocket', () => {
     expect(mockStore.setError).toHaveBeenCalledWith('Analysis failed');
   });
 
+  it('handles batched message frames', () => {
+    renderHook(() => useWebSocket());
+
+    act(() => {
+      mockWebSocket.simulateOpen();
+      mockWebSocket.simulateMessage([
+        {
+          type: 'agent_status',
+          session_id: 'test-session',
+          timestamp: '2025-08-28T03:40:00Z',
+          data: { agent_name: 'Market Analyst', status: 'completed', progress: 100 },
+        },
+        {
+          type: 'error',
+          session_id: 'test-session',
+          timestamp: '2025-08-28T03:40:01Z',
+          data: { error: 'Analysis failed' },
+        },
+      ]);
+    });
+
+    expect(mockStore.updateAgentStatus).toHaveBeenCalledWith('Market Analyst', {
+      agent_name: 'Market Analyst',
+      status: 'completed',
+      progress: 100,
+    });
+    expect(mockStore.setError).toHaveBeenCalledWith('Analysis failed');
+  });
+
   it('handles connection close', () => {
     renderHook(() => useWebSocket());
 